@@ -17,10 +17,16 @@ def mixer():
     return _mixer
 
 
+@pytest.fixture(scope='session')
+def image_name():
+    """Одно имя файла картинки на всю сессию вместо нового на каждый тест."""
+    with tempfile.NamedTemporaryFile(suffix=".jpg") as image_file:
+        yield image_file.name
+
+
 @pytest.fixture
-def post(user):
-    image = tempfile.NamedTemporaryFile(suffix=".jpg").name
-    return Post.objects.create(text='Тестовый пост 1', author=user, image=image)
+def post(user, image_name):
+    return Post.objects.create(text='Тестовый пост 1', author=user, image=image_name)
 
 
 @pytest.fixture
@@ -29,19 +35,22 @@ def group():
 
 
 @pytest.fixture
-def post_with_group(user, group):
-    image = tempfile.NamedTemporaryFile(suffix=".jpg").name
-    return Post.objects.create(text='Тестовый пост 2', author=user, group=group, image=image)
+def post_with_group(user, group, image_name):
+    return Post.objects.create(text='Тестовый пост 2', author=user, group=group, image=image_name)
 
 
 @pytest.fixture
 def few_posts_with_group(mixer, user, group):
     """Return one record with the same author and group."""
-    posts = mixer.cycle(20).blend(Post, author=user, group=group)
+    with mixer.ctx(commit=False):
+        posts = mixer.cycle(20).blend(Post, author=user, group=group)
+    Post.objects.bulk_create(posts)
     return posts[0]
 
 
 @pytest.fixture
 def another_few_posts_with_group_with_follower(mixer, user, another_user, group):
     mixer.blend('posts.Follow', user=user, author=another_user)
-    mixer.cycle(20).blend(Post, author=another_user, group=group)
+    with mixer.ctx(commit=False):
+        posts = mixer.cycle(20).blend(Post, author=another_user, group=group)
+    Post.objects.bulk_create(posts)
@@ -0,0 +1,33 @@
+from collections import defaultdict
+
+SLOWEST_TESTS = 10
+
+_durations = defaultdict(float)
+
+
+def _worker_id(report):
+    gateway = getattr(getattr(report, 'node', None), 'gateway', None)
+    return getattr(gateway, 'id', 'main')
+
+
+def pytest_runtest_logreport(report):
+    """Суммирует время setup, call и teardown каждого теста."""
+    _durations[(_worker_id(report), report.nodeid)] += report.duration
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _durations:
+        return
+    workers = defaultdict(lambda: [0, 0.0])
+    for (worker, _), seconds in _durations.items():
+        workers[worker][0] += 1
+        workers[worker][1] += seconds
+    terminalreporter.section('время по процессам')
+    for worker, (count, total) in sorted(workers.items()):
+        terminalreporter.write_line(
+            f'{worker}: {count} тестов, {total:.2f} с')
+    terminalreporter.section('самые медленные тесты')
+    slowest = sorted(
+        _durations.items(), key=lambda item: item[1], reverse=True)
+    for (worker, nodeid), seconds in slowest[:SLOWEST_TESTS]:
+        terminalreporter.write_line(f'{seconds:.3f} с [{worker}] {nodeid}')
@@ -0,0 +1,135 @@
+"""ASGI-обертка над WSGI-приложением.
+
+Django 2.2 не поддерживает ASGI и асинхронные представления, поэтому
+запрос целиком выполняется синхронным Django в ограниченном пуле потоков.
+Event loop при этом только принимает соединения, читает тело запроса
+и отдает ответ: медленный клиент не держит поток, а число одновременных
+запросов к базе ограничено размером пула.
+"""
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+MAX_WORKERS = 16
+BODY_MEMORY_LIMIT = 1024 * 1024
+
+
+def build_environ(scope, body):
+    """WSGI environ для HTTP-соединения ASGI."""
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path.encode().decode('latin1'),
+        'PATH_INFO': path.encode().decode('latin1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin1').upper().replace('-', '_')
+        value = value.decode('latin1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        if name in environ:
+            value = f'{environ[name]},{value}'
+        environ[name] = value
+    return environ
+
+
+class WsgiToAsgi:
+    def __init__(self, wsgi_application, max_workers=MAX_WORKERS):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix='asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            await self.http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        else:
+            raise ValueError(f'Неподдерживаемое соединение: {scope["type"]}')
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.executor.shutdown)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def http(self, scope, receive, send):
+        body = SpooledTemporaryFile(BODY_MEMORY_LIMIT)
+        try:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+                body.write(message.get('body', b''))
+                if not message.get('more_body'):
+                    break
+            body.seek(0)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                self.executor, self.run_wsgi, loop, scope, body, send)
+        finally:
+            body.close()
+
+    def run_wsgi(self, loop, scope, body, send):
+        """Выполняется в потоке пула. Части ответа передаются в event loop
+        по мере того, как их отдает Django."""
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response.get('started'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin1'), value.encode('latin1'))
+                for name, value in headers
+            ]
+
+        def send_sync(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def start():
+            if not response.get('started'):
+                response['started'] = True
+                send_sync({
+                    'type': 'http.response.start',
+                    'status': response['status'],
+                    'headers': response['headers'],
+                })
+
+        result = self.wsgi_application(build_environ(scope, body),
+                                       start_response)
+        try:
+            for chunk in result:
+                if chunk:
+                    start()
+                    send_sync({'type': 'http.response.body', 'body': chunk,
+                               'more_body': True})
+            start()
+            send_sync({'type': 'http.response.body', 'body': b''})
+        finally:
+            # Django закрывает соединения с базой в этом же потоке.
+            if hasattr(result, 'close'):
+                result.close()
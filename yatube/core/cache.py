@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import MemcachedCache
+from django.db import transaction
+
+from .metrics import CACHE_REQUESTS, key_family
+
+_MISSING = object()
+
+
+class MetricsCacheMixin:
+    """Считает попадания и промахи чтений по семействам ключей.
+
+    get_many и get_or_set базового класса читают через get.
+    """
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        hit = value is not _MISSING
+        CACHE_REQUESTS.inc(
+            family=key_family(key), result='hit' if hit else 'miss')
+        return value if hit else default
+
+
+class MetricsLocMemCache(MetricsCacheMixin, LocMemCache):
+    pass
+
+
+class MetricsMemcachedCache(MetricsCacheMixin, MemcachedCache):
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version)
+        for key in keys:
+            CACHE_REQUESTS.inc(
+                family=key_family(key),
+                result='hit' if key in found else 'miss')
+        return found
+
+
+def shared_cache():
+    """Общий ли кэш для всех процессов (settings.SHARED_CACHE).
+
+    Данные, которые нельзя отдавать устаревшими после изменения в другом
+    воркере, кэшируются только в общем кэше.
+    """
+    return settings.SHARED_CACHE
+
+
+def delete_after_commit(keys):
+    """Удаляет ключи сразу и еще раз после коммита.
+
+    Второе удаление убирает значение, которое параллельный запрос
+    успел закэшировать по данным, еще не видевшим изменения.
+    """
+    keys = list(keys)
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,17 @@
+class LazyURLConf:
+    """URLconf, чьи маршруты строятся при первом обращении к ним.
+
+    Передается в path() кортежем (LazyURLConf(...), app_name, namespace):
+    такой URLResolver читает urlpatterns только при разборе адреса
+    под своим префиксом или при reverse() в своем namespace.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self._patterns = None
+
+    @property
+    def urlpatterns(self):
+        if self._patterns is None:
+            self._patterns = self.build()
+        return self._patterns
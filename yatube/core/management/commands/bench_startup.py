@@ -0,0 +1,89 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Выполняется в новом процессе: загрузка WSGI-приложения и два запроса.
+PROBE = '''
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+started = time.perf_counter()
+from yatube.wsgi import application
+loaded = time.perf_counter()
+
+def request(path):
+    environ = {'PATH_INFO': path}
+    setup_testing_defaults(environ)
+    status = []
+    result = application(environ, lambda code, headers, exc_info=None:
+                         status.append(code))
+    try:
+        for _ in result:
+            pass
+    finally:
+        result.close()
+    return int(status[0].split()[0])
+
+status = request(sys.argv[1])
+first = time.perf_counter()
+request(sys.argv[1])
+second = time.perf_counter()
+print(json.dumps({
+    'status': status,
+    'import': loaded - started,
+    'first_response': first - started,
+    'second_response': second - first,
+}))
+'''
+MEASURES = ('import', 'first_response', 'second_response', 'process')
+MODES = (('без прогрева', '0'), ('с прогревом', '1'))
+
+
+class Command(BaseCommand):
+    help = ('Измеряет холодный старт без прогрева и с прогревом '
+            '(YATUBE_PRELOAD=1): время загрузки WSGI-приложения и первого '
+            'ответа. Прогрев переносит работу первого запроса в запуск '
+            'воркера; без gunicorn --preload ее делает каждый воркер.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/')
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        medians = {}
+        for mode, preload in MODES:
+            env = dict(
+                os.environ,
+                DJANGO_SETTINGS_MODULE=os.environ.get(
+                    'DJANGO_SETTINGS_MODULE', 'yatube.settings'),
+                YATUBE_PRELOAD=preload,
+            )
+            runs = [self.run_probe(options['path'], env)
+                    for _ in range(options['runs'])]
+            self.stdout.write(f'{mode}, код ответа: {runs[0]["status"]}')
+            for measure in MEASURES:
+                values = sorted(run[measure] * 1000 for run in runs)
+                medians[mode, measure] = statistics.median(values)
+                self.stdout.write(
+                    f'  {measure}: медиана {medians[mode, measure]:.1f} мс, '
+                    f'мин {values[0]:.1f} мс, макс {values[-1]:.1f} мс')
+        (plain, _), (warm, _) = MODES
+        self.stdout.write('Прогрев (медианы):')
+        for measure in ('import', 'first_response'):
+            delta = medians[warm, measure] - medians[plain, measure]
+            self.stdout.write(f'  {measure}: {delta:+.1f} мс')
+
+    @staticmethod
+    def run_probe(path, env):
+        started = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, '-c', PROBE, path], cwd=settings.BASE_DIR,
+            env=env, capture_output=True, text=True, check=True)
+        result = json.loads(process.stdout.splitlines()[-1])
+        result['process'] = time.perf_counter() - started
+        return result
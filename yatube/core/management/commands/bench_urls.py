@@ -0,0 +1,73 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.urls import Resolver404, URLResolver
+from django.urls.resolvers import RoutePattern
+
+from core.resolvers import PrefixURLResolver
+
+# Пути без ведущей косой черты: их получает вложенный резолвер posts.
+# {n} - случайный id, {name} - случайное имя, как в настоящем трафике,
+# где адреса почти не повторяются. Последние шаблоны - адреса, которые
+# перебирают сканеры.
+PATH_TEMPLATES = (
+    '',
+    'posts/{n}/',
+    'posts/{n}/comment/',
+    'profile/{name}/',
+    'profile/{name}/feed/',
+    'group/{name}/',
+    'follow/',
+    'changes/',
+    'wp-login.php',
+    '{name}/.env',
+    'cgi-bin/{name}.cgi',
+    'posts/{name}/',
+)
+
+
+def random_name(rng):
+    return ''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=8))
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает скорость разбора адресов маршрутов posts '
+            'обычным URLResolver и PrefixURLResolver на разных адресах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        def build(resolver_class):
+            return resolver_class(
+                RoutePattern('', is_endpoint=False), 'posts.urls',
+                app_name='posts', namespace='posts')
+
+        rng = random.Random(options['seed'])
+        rounds = options['rounds']
+        paths = {
+            template: [
+                template.format(
+                    n=rng.randrange(1, 10 ** 6), name=random_name(rng))
+                for _ in range(rounds)
+            ]
+            for template in PATH_TEMPLATES
+        }
+        modes = {
+            'URLResolver': build(URLResolver).resolve,
+            'PrefixURLResolver': build(PrefixURLResolver).resolve,
+        }
+        for mode, resolve in modes.items():
+            self.stdout.write(mode)
+            for template, samples in paths.items():
+                started = time.perf_counter()
+                for path in samples:
+                    try:
+                        resolve(path)
+                    except Resolver404:
+                        pass
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'  /{template:<22} {elapsed / rounds * 1e6:7.2f} мкс')
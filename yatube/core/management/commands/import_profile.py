@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.startup import by_package, parse_importtime
+
+TARGETS = {
+    'setup': 'import django; django.setup()',
+    'wsgi': 'import yatube.wsgi',
+}
+
+
+class Command(BaseCommand):
+    help = ('Запускает отдельный процесс с python -X importtime и '
+            'показывает самые медленные импорты при старте.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', choices=sorted(TARGETS), default='wsgi',
+            help='setup - только django.setup(), wsgi - загрузка '
+                 'yatube.wsgi вместе с прогревом.',
+        )
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument(
+            '--sort', choices=('cumulative', 'own'), default='cumulative')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+            'DJANGO_SETTINGS_MODULE', 'yatube.settings'))
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c',
+             TARGETS[options['target']]],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        rows = parse_importtime(process.stderr.splitlines())
+        if process.returncode or not rows:
+            self.stderr.write(process.stderr[-2000:])
+            return
+        total = sum(row[2] for row in rows if row[3] == 0)
+        self.stdout.write(
+            f'Модулей: {len(rows)}, время импорта: {total / 1000:.1f} мс')
+        column = 2 if options['sort'] == 'cumulative' else 1
+        self.stdout.write(f'\n{"мс":>8} {"свое мс":>8}  модуль')
+        for module, own, cumulative, depth in sorted(
+                rows, key=lambda row: -row[column])[:options['top']]:
+            self.stdout.write(
+                f'{cumulative / 1000:8.1f} {own / 1000:8.1f}  '
+                f'{"  " * depth}{module}')
+        self.stdout.write(f'\n{"мс":>8}  пакет')
+        for package, own in by_package(rows)[:options['top']]:
+            self.stdout.write(f'{own / 1000:8.1f}  {package}')
+        if any(row[0] == 'pkg_resources' for row in rows):
+            self.stdout.write(
+                '\ndistutils подменен setuptools и тянет pkg_resources: '
+                'запуск с SETUPTOOLS_USE_DISTUTILS=stdlib убирает этот '
+                'импорт.')
@@ -0,0 +1,45 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+PAUSE = 0.05
+
+
+class Command(BaseCommand):
+    help = ('Удаляет просроченные сессии из базы небольшими пачками, '
+            'каждая в своей короткой транзакции, чтобы не блокировать '
+            'запись надолго.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--pause', type=float, default=PAUSE,
+            help='Пауза между пачками в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not issubclass(store, DBStore):
+            # Сессии хранятся не в базе: кэш и куки истекают сами.
+            store.clear_expired()
+            self.stdout.write('Сессии хранятся не в базе, удалять нечего')
+            return
+        model = store.get_model_class()
+        expired = model.objects.filter(expire_date__lt=timezone.now())
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                keys = list(expired.values_list(
+                    'session_key', flat=True)[:options['batch_size']])
+                if not keys:
+                    break
+                model.objects.filter(session_key__in=keys).delete()
+            deleted += len(keys)
+            time.sleep(options['pause'])
+        self.stdout.write(f'Удалено просроченных сессий: {deleted}')
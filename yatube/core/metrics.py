@@ -0,0 +1,304 @@
+"""Метрики приложения в текстовом формате Prometheus.
+
+Счетчики и гистограммы живут в памяти процесса. Если задан каталог
+METRICS_DIR (или переменная окружения YATUBE_METRICS_DIR), каждый
+процесс не чаще раза в METRICS_FLUSH_INTERVAL секунд пишет туда свой
+снимок, а /metrics складывает снимки всех процессов, так что при
+нескольких воркерах любой из них отдает общие значения. При выходе
+процесс пишет последний снимок. Снимки завершившихся процессов
+сливаются в один файл retired.json, так что их счетчики остаются
+в сумме, а число файлов не растет с каждым перезапуском воркера.
+"""
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+METRICS_DIR = getattr(
+    settings, 'METRICS_DIR', os.environ.get('YATUBE_METRICS_DIR'))
+METRICS_FLUSH_INTERVAL = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+RETIRED_SNAPSHOT = 'retired.json'
+LOCK_FILE = '.lock'
+SESSION_KEY_PREFIX = 'django.contrib.sessions.'
+# Ключи sorl-thumbnail: '<префикс>||image||<хэш>', '<префикс>||thumbnails||...'
+THUMBNAIL_KEY_PREFIX = getattr(
+    settings, 'THUMBNAIL_KEY_PREFIX', 'sorl-thumbnail')
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace(
+        '"', r'\"').replace('\n', r'\n')
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Процесс есть, но принадлежит другому пользователю.
+        return True
+    return True
+
+
+def _snapshot_pid(name):
+    """pid из имени снимка '<pid>-<started>.json' или None."""
+    pid = name.split('-', 1)[0]
+    return int(pid) if name.endswith('.json') and pid.isdigit() else None
+
+
+def _read_snapshot(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        # Файл удалили или еще пишут.
+        return None
+
+
+def _write_snapshot(path, snapshot):
+    with open(f'{path}.tmp', 'w') as file:
+        json.dump(snapshot, file)
+    os.replace(f'{path}.tmp', path)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return f'{{{pairs}}}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, registry, name, documentation):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dump(self):
+        return [[list(map(list, key)), value]
+                for key, value in self.values.items()]
+
+    @staticmethod
+    def merge(total, value):
+        return value if total is None else total + value
+
+    def render(self, values):
+        for key, value in sorted(values.items()):
+            yield f'{self.name}{_format_labels(key)} {_format_value(value)}'
+
+
+class Histogram:
+    """Гистограмма: число наблюдений по корзинам, их сумма и число."""
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, buckets):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.values = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.registry.lock:
+            counts = self.values.setdefault(
+                key, [0] * (len(self.buckets) + 1) + [0])
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    break
+            else:
+                position = len(self.buckets)
+            counts[position] += 1
+            counts[-1] += value
+
+    def dump(self):
+        return [[list(map(list, key)), list(counts)]
+                for key, counts in self.values.items()]
+
+    @staticmethod
+    def merge(total, counts):
+        if total is None:
+            return list(counts)
+        return [a + b for a, b in zip(total, counts)]
+
+    def render(self, values):
+        bounds = [_format_value(bound) for bound in self.buckets] + ['+Inf']
+        for key, counts in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _format_labels(key + (('le', bound),))
+                yield f'{self.name}_bucket{labels} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(key)} {counts[-1]}'
+            yield f'{self.name}_count{_format_labels(key)} {cumulative}'
+
+
+class Registry:
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.started = int(time.time())
+        self.flushed = 0
+
+    def counter(self, name, documentation):
+        return self._register(Counter(self, name, documentation))
+
+    def histogram(self, name, documentation, buckets=LATENCY_BUCKETS):
+        return self._register(
+            Histogram(self, name, documentation, buckets))
+
+    def _register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def dump(self):
+        with self.lock:
+            return {name: metric.dump()
+                    for name, metric in self.metrics.items()}
+
+    def snapshot_path(self):
+        return os.path.join(
+            self.directory, f'{os.getpid()}-{self.started}.json')
+
+    def flush(self, force=False):
+        """Пишет снимок процесса в каталог метрик, если пора."""
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self.flushed < METRICS_FLUSH_INTERVAL:
+            return
+        self.flushed = now
+        os.makedirs(self.directory, exist_ok=True)
+        _write_snapshot(self.snapshot_path(), self.dump())
+
+    def directory_lock(self, operation):
+        """Блокировка каталога метрик: слияние снимков исключает
+        их чтение, иначе /metrics мог бы сложить одни значения дважды."""
+        lock = open(os.path.join(self.directory, LOCK_FILE), 'a')
+        fcntl.flock(lock, operation)
+        return lock
+
+    def compact(self):
+        """Сливает снимки завершившихся процессов в retired.json."""
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        with self.directory_lock(fcntl.LOCK_EX):
+            names = [
+                name for name in os.listdir(self.directory)
+                if _snapshot_pid(name) is not None
+                and not process_alive(_snapshot_pid(name))
+            ]
+            if not names:
+                return
+            retired = os.path.join(self.directory, RETIRED_SNAPSHOT)
+            snapshots = [_read_snapshot(retired)] + [
+                _read_snapshot(os.path.join(self.directory, name))
+                for name in names]
+            totals = self.merge(filter(None, snapshots))
+            _write_snapshot(retired, {
+                name: [[list(map(list, key)), value]
+                       for key, value in values.items()]
+                for name, values in totals.items()
+            })
+            for name in names:
+                os.remove(os.path.join(self.directory, name))
+
+    def snapshots(self):
+        """Снимки всех процессов: свой - из памяти, чужие и слитые
+        снимки завершившихся - из файлов."""
+        yield self.dump()
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        own = os.path.basename(self.snapshot_path())
+        with self.directory_lock(fcntl.LOCK_SH):
+            for name in os.listdir(self.directory):
+                if name == own or not name.endswith('.json'):
+                    continue
+                snapshot = _read_snapshot(
+                    os.path.join(self.directory, name))
+                if snapshot is not None:
+                    yield snapshot
+
+    def merge(self, snapshots):
+        """Складывает снимки: {имя метрики: {метки: значение}}."""
+        totals = {name: {} for name in self.metrics}
+        for snapshot in snapshots:
+            for name, rows in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                for labels, value in rows:
+                    key = tuple(map(tuple, labels))
+                    totals[name][key] = metric.merge(
+                        totals[name].get(key), value)
+        return totals
+
+    def render(self):
+        self.compact()
+        totals = self.merge(self.snapshots())
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            lines.extend(metric.render(totals[name]))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry(METRICS_DIR)
+atexit.register(REGISTRY.flush, force=True)
+
+REQUESTS = REGISTRY.counter(
+    'yatube_http_requests_total', 'Число запросов по представлениям')
+REQUEST_DURATION = REGISTRY.histogram(
+    'yatube_http_request_duration_seconds',
+    'Время ответа по представлениям')
+REQUEST_QUERIES = REGISTRY.histogram(
+    'yatube_http_request_db_queries',
+    'Число SQL-запросов на запрос по представлениям', QUERY_BUCKETS)
+CACHE_REQUESTS = REGISTRY.counter(
+    'yatube_cache_requests_total',
+    'Чтения из кэша по семействам ключей: попадания и промахи')
+THUMBNAIL_REQUESTS = REGISTRY.counter(
+    'yatube_thumbnail_requests_total',
+    'Запросы миниатюр: готовые и созданные заново')
+THUMBNAIL_DURATION = REGISTRY.histogram(
+    'yatube_thumbnail_generation_seconds', 'Время создания миниатюры')
+OBJECTS_CREATED = REGISTRY.counter(
+    'yatube_objects_created_total',
+    'Созданные посты, комментарии и подписки')
+
+
+def key_family(key):
+    """Семейство ключа кэша: часть до первого двоеточия, для фрагментов
+    шаблонов - имя фрагмента, например index_page, для ключей
+    sorl-thumbnail - thumbnails."""
+    key = str(key)
+    if key.startswith('template.cache.'):
+        # Имя фрагмента в шаблоне может быть записано в кавычках.
+        return key.split('.')[2].strip('\'"')
+    if key.startswith(SESSION_KEY_PREFIX):
+        return 'session'
+    if key.startswith(f'{THUMBNAIL_KEY_PREFIX}||'):
+        return 'thumbnails'
+    return key.split(':', 1)[0]
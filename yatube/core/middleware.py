@@ -0,0 +1,35 @@
+import time
+
+from django.db import connection
+
+from .metrics import REGISTRY, REQUEST_DURATION, REQUEST_QUERIES, REQUESTS
+
+
+class MetricsMiddleware:
+    """Время ответа и число SQL-запросов по представлениям.
+
+    Стоит первым в MIDDLEWARE, чтобы учитывать работу всех остальных.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match is not None else 'unresolved'
+        REQUESTS.inc(view=view, status=response.status_code)
+        REQUEST_DURATION.observe(elapsed, view=view)
+        REQUEST_QUERIES.observe(queries, view=view)
+        REGISTRY.flush()
+        return response
@@ -1,13 +1,58 @@
-from django.db import models
+from django.db import models, router, transaction
 
 
-class CreatedModel(models.Model):
-    """Абстрактная модель. Добавляет дату создания."""
+class CreatedQuerySet(models.QuerySet):
+    def changed_since(self, timestamp):
+        """Объекты, созданные или измененные после timestamp,
+        в порядке изменения."""
+        return self.filter(
+            updated_at__gt=timestamp
+        ).order_by('updated_at', 'pk')
+
+    def published_between(self, start, end):
+        """Объекты, опубликованные в полуинтервале [start, end)."""
+        return self.filter(pub_date__gte=start, pub_date__lt=end)
+
+
+class SubqueryCount(models.Subquery):
+    """Число строк подзапроса как столбец внешнего запроса: счетчики
+    читаются тем же запросом, что и сам объект."""
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) _count)'
+    output_field = models.IntegerField()
+
+    def __init__(self, queryset, **extra):
+        super().__init__(queryset.order_by().values('pk'), **extra)
+
+
+class AtomicSaveModel(models.Model):
+    """Абстрактная модель. Сохраняет объект в транзакции вместе
+    с записями, которые делают обработчики post_save."""
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+
+
+class CreatedModel(AtomicSaveModel):
+    """Абстрактная модель. Добавляет дату создания и дату изменения."""
     pub_date = models.DateTimeField(
         'Дата создания',
-        auto_now_add=True
+        auto_now_add=True,
+        db_index=True
+    )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        db_index=True
     )
 
+    objects = CreatedQuerySet.as_manager()
+
     class Meta:
         abstract = True
         ordering = ('-pub_date',)
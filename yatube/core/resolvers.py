@@ -0,0 +1,64 @@
+"""Быстрый разбор адресов для самых нагруженных маршрутов.
+
+Обычный URLResolver перебирает маршруты по порядку, пока один не
+подойдет. PrefixURLResolver раскладывает свои маршруты по первому
+сегменту пути и пробует только подходящую группу. Кэшируется только
+эта раскладка, ее размер ограничен числом маршрутов: адреса в кэш
+не попадают, так что перебор несуществующих адресов его не вытесняет,
+а каждый запрос получает свой ResolverMatch.
+"""
+from django.urls import Resolver404, URLResolver, include
+from django.urls.resolvers import RoutePattern
+from django.utils.functional import cached_property
+
+ANY_SEGMENT = None
+
+
+def first_segment(pattern):
+    """Постоянный первый сегмент маршрута или ANY_SEGMENT, если он
+    начинается с параметра или задан регулярным выражением."""
+    if not isinstance(pattern.pattern, RoutePattern):
+        return ANY_SEGMENT
+    segment = str(pattern.pattern).split('/', 1)[0]
+    return ANY_SEGMENT if '<' in segment else segment
+
+
+class PrefixURLResolver(URLResolver):
+    @cached_property
+    def segment_resolvers(self):
+        """Для каждого первого сегмента - URLResolver только с его
+        маршрутами и маршрутами с любым началом, в исходном порядке."""
+        segments = {first_segment(pattern) for pattern in self.url_patterns}
+        resolvers = {}
+        for segment in segments:
+            patterns = [
+                pattern for pattern in self.url_patterns
+                if first_segment(pattern) in (segment, ANY_SEGMENT)
+            ]
+            resolvers[segment] = URLResolver(
+                self.pattern, patterns, self.default_kwargs,
+                app_name=self.app_name, namespace=self.namespace)
+        return resolvers
+
+    def segment_resolver(self, path):
+        """URLResolver группы маршрутов для пути или None."""
+        match = self.pattern.match(path)
+        segment = match[0].split('/', 1)[0] if match else ''
+        return self.segment_resolvers.get(
+            segment, self.segment_resolvers.get(ANY_SEGMENT))
+
+    def resolve(self, path):
+        path = str(path)
+        resolver = self.segment_resolver(path)
+        if resolver is None:
+            raise Resolver404({'tried': [], 'path': path})
+        return resolver.resolve(path)
+
+
+def prefix_path(route, urlconf, namespace=None):
+    """Аналог path(route, include(urlconf, namespace)), но с
+    PrefixURLResolver."""
+    urlconf_module, app_name, namespace = include(urlconf, namespace)
+    return PrefixURLResolver(
+        RoutePattern(route, is_endpoint=False), urlconf_module,
+        app_name=app_name, namespace=namespace)
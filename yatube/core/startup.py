@@ -0,0 +1,102 @@
+"""Запуск воркера: предварительный прогрев и разбор отчета -X importtime.
+
+preload() выполняет то, что иначе делал бы первый запрос: строит
+таблицы URL-резолвера, компилирует основные шаблоны и заполняет кэши.
+При запуске с общей предзагрузкой (gunicorn --preload) это делается
+один раз в главном процессе, а воркеры получают готовое после fork.
+
+По умолчанию прогрев выключен: без --preload каждый воркер при старте
+делает работу, которая иначе досталась бы одному первому запросу,
+а с общим кэшем еще и читает до WARM_LIMIT пользователей. Включается
+переменной YATUBE_PRELOAD=1, выигрыш на первом запросе и цену при
+старте показывает manage.py bench_startup.
+"""
+import re
+import time
+
+from django.conf import settings
+from django.db import DatabaseError
+
+PRELOAD_TEMPLATES = getattr(settings, 'PRELOAD_TEMPLATES', (
+    'posts/index.html',
+    'posts/group_list.html',
+    'posts/profile.html',
+    'posts/post_detail.html',
+    'posts/includes/post_list.html',
+))
+IMPORTTIME_LINE = re.compile(
+    r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def _warm_resolver(resolver):
+    # reverse_dict заполняет таблицы вложенных URLconf без namespace,
+    # резолверы с namespace заполняются отдельно.
+    resolver.reverse_dict
+    # Раскладка маршрутов по сегментам у PrefixURLResolver.
+    getattr(resolver, 'segment_resolvers', None)
+    for _, namespaced in resolver.namespace_dict.values():
+        _warm_resolver(namespaced)
+
+
+def _resolver():
+    from django.urls import get_resolver
+
+    resolver = get_resolver()
+    _warm_resolver(resolver)
+    return resolver
+
+
+def _templates():
+    from django.template.loader import get_template
+
+    for name in PRELOAD_TEMPLATES:
+        get_template(name)
+
+
+def _caches():
+    from users.resolver import warm_usernames
+
+    try:
+        warm_usernames()
+    except DatabaseError:
+        # База еще не готова, например до первого migrate.
+        pass
+
+
+PRELOAD_STEPS = (
+    ('resolver', _resolver),
+    ('templates', _templates),
+    ('caches', _caches),
+)
+
+
+def preload():
+    """Выполняет шаги прогрева и возвращает их время в секундах."""
+    timings = {}
+    for name, step in PRELOAD_STEPS:
+        started = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def parse_importtime(lines):
+    """Строки отчета -X importtime как кортежи
+    (модуль, собственное время, общее время, глубина), время в мкс."""
+    result = []
+    for line in lines:
+        match = IMPORTTIME_LINE.match(line.rstrip('\n'))
+        if match:
+            own, cumulative, indent, module = match.groups()
+            result.append(
+                (module, int(own), int(cumulative), len(indent) // 2))
+    return result
+
+
+def by_package(rows):
+    """Собственное время импорта, сложенное по пакетам верхнего уровня."""
+    totals = {}
+    for module, own, _, _ in rows:
+        package = module.split('.')[0]
+        totals[package] = totals.get(package, 0) + own
+    return sorted(totals.items(), key=lambda item: -item[1])
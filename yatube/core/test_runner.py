@@ -0,0 +1,91 @@
+import time
+from collections import defaultdict
+from unittest import TextTestResult
+
+from django.test import runner as django_runner
+from django.test.runner import (DiscoverRunner, ParallelTestSuite,
+                                RemoteTestResult, RemoteTestRunner)
+
+SLOWEST_TESTS = 10
+
+
+class TimingResultMixin:
+    """Замеряет время каждого теста между startTest и stopTest."""
+
+    def startTest(self, test):
+        self._test_started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.record_timing(test, time.perf_counter() - self._test_started)
+
+
+class TimedTextTestResult(TextTestResult):
+    """Результат, который собирает время тестов по процессам."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = []
+
+    def addTiming(self, test, worker, seconds):
+        self.timings.append((seconds, worker, test.id()))
+
+
+class SerialTimedTextTestResult(TimingResultMixin, TimedTextTestResult):
+    def record_timing(self, test, seconds):
+        self.addTiming(test, 0, seconds)
+
+
+class TimedRemoteTestResult(TimingResultMixin, RemoteTestResult):
+    """Результат в дочернем процессе: время передается в основной
+    процесс отдельным событием вместе с номером процесса."""
+
+    def record_timing(self, test, seconds):
+        self.events.append(
+            ('addTiming', self.test_index, django_runner._worker_id, seconds)
+        )
+
+
+class TimedRemoteTestRunner(RemoteTestRunner):
+    resultclass = TimedRemoteTestResult
+
+
+class TimedParallelTestSuite(ParallelTestSuite):
+    runner_class = TimedRemoteTestRunner
+
+
+class TimedTestRunner(DiscoverRunner):
+    """Запускает тесты и печатает время по процессам и самые медленные
+    тесты.
+
+    С ключом --parallel каждый процесс работает со своей копией
+    тестовой базы SQLite.
+    """
+    parallel_test_suite = TimedParallelTestSuite
+
+    def get_resultclass(self):
+        if self.debug_sql:
+            return super().get_resultclass()
+        if self.parallel > 1:
+            return TimedTextTestResult
+        return SerialTimedTextTestResult
+
+    def run_suite(self, suite, **kwargs):
+        result = super().run_suite(suite, **kwargs)
+        if self.verbosity > 0 and getattr(result, 'timings', None):
+            self.report_timings(result.timings)
+        return result
+
+    def report_timings(self, timings):
+        workers = defaultdict(lambda: [0, 0.0])
+        for seconds, worker, _ in timings:
+            workers[worker][0] += 1
+            workers[worker][1] += seconds
+        print('\nВремя по процессам:')
+        for worker, (count, total) in sorted(workers.items()):
+            print(f'  процесс {worker}: {count} тестов, {total:.2f} с')
+        print('Самые медленные тесты:')
+        for seconds, worker, test_id in sorted(timings, reverse=True)[
+                :SLOWEST_TESTS]:
+            print(f'  {seconds:.3f} с  [{worker}] {test_id}')
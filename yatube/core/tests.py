@@ -1,4 +1,30 @@
-from django.test import TestCase
+import asyncio
+import os
+import runpy
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.core.cache import _create_cache
+from django.core.management import call_command
+from django.core.wsgi import get_wsgi_application
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import (
+    Resolver404, URLResolver, clear_url_caches, get_resolver, resolve,
+    reverse)
+from django.urls.resolvers import RoutePattern
+from django.utils import timezone
+
+from core.asgi import WsgiToAsgi
+from core.cache import MetricsMemcachedCache
+from core.lazy import LazyURLConf
+from core.metrics import Registry, key_family
+from core.resolvers import PrefixURLResolver
+from core.startup import by_package, parse_importtime, preload
+from yatube import settings as yatube_settings
 
 
 class ViewTestClass(TestCase):
@@ -6,3 +32,270 @@ class ViewTestClass(TestCase):
         response = self.client.get('/nonexist-page/')
         self.assertEqual(response.status_code, 404)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+class AsgiTests(SimpleTestCase):
+    def request(self, method, path, body=b'', headers=()):
+        application = WsgiToAsgi(get_wsgi_application(), max_workers=2)
+        messages = [{'type': 'http.request', 'body': body}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(application({
+            'type': 'http',
+            'method': method,
+            'path': path,
+            'query_string': b'',
+            'headers': [(b'host', b'testserver'), *headers],
+            'server': ('testserver', 80),
+        }, receive, send))
+        application.executor.shutdown()
+        return sent[0]['status'], b''.join(
+            message.get('body', b'') for message in sent[1:])
+
+    def test_get(self):
+        status, body = self.request('GET', reverse('about:author'))
+        self.assertEqual(status, 200)
+        self.assertIn('Привет, я автор'.encode(), body)
+
+    def test_post_body_and_headers(self):
+        """Тело и заголовки доходят до Django: POST без CSRF-токена
+        получает страницу ошибки CSRF."""
+        _, body = self.request(
+            'POST', reverse('users:login'), b'username=a&password=b',
+            [(b'content-type', b'application/x-www-form-urlencoded')])
+        self.assertIn(b'CSRF', body)
+
+    def test_lifespan(self):
+        application = WsgiToAsgi(get_wsgi_application(), max_workers=1)
+        messages = [{'type': 'lifespan.startup'},
+                    {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        asyncio.run(application({'type': 'lifespan'}, receive, send))
+        self.assertEqual(sent, ['lifespan.startup.complete',
+                                'lifespan.shutdown.complete'])
+
+
+class PurgeSessionsTests(TestCase):
+    def test_purge_sessions(self):
+        """Удаляются только просроченные сессии."""
+        now = timezone.now()
+        Session.objects.bulk_create(
+            Session(session_key=f'expired{i}', session_data='',
+                    expire_date=now - timedelta(days=1))
+            for i in range(5))
+        Session.objects.create(
+            session_key='alive', session_data='',
+            expire_date=now + timedelta(days=1))
+        out = StringIO()
+        call_command('purge_sessions', batch_size=2, pause=0, stdout=out)
+        self.assertIn('5', out.getvalue())
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['alive'])
+
+
+class StartupTests(TestCase):
+    def test_parse_importtime(self):
+        lines = [
+            'import time: self [us] | cumulative | imported package',
+            'import time:       150 |        150 |     posts.ranking',
+            'import time:       300 |        450 |   posts.models',
+            'import time:        50 |        500 | posts',
+        ]
+        rows = parse_importtime(lines)
+        self.assertEqual(rows[1], ('posts.models', 300, 450, 1))
+        self.assertEqual(rows[2][3], 0)
+        self.assertEqual(by_package(rows), [('posts', 500)])
+
+    def test_preload(self):
+        self.assertEqual(
+            set(preload()), {'resolver', 'templates', 'caches'})
+
+    def test_preload_namespaced_resolvers(self):
+        """Прогрев заполняет и резолверы с namespace."""
+        clear_url_caches()
+        self.addCleanup(clear_url_caches)
+        preload()
+        posts = get_resolver().namespace_dict['posts'][1]
+        self.assertTrue(posts._populated)
+        self.assertIn('segment_resolvers', posts.__dict__)
+
+    def test_lazy_urlconf(self):
+        """Маршруты строятся один раз и только при обращении."""
+        calls = []
+        urlconf = LazyURLConf(lambda: calls.append(1) or ['pattern'])
+        self.assertEqual(calls, [])
+        self.assertEqual(urlconf.urlpatterns, ['pattern'])
+        self.assertEqual(urlconf.urlpatterns, ['pattern'])
+        self.assertEqual(calls, [1])
+
+    def test_admin_urls(self):
+        self.assertEqual(reverse('admin:index'), '/admin/')
+
+
+class PrefixResolverTests(SimpleTestCase):
+    PATHS = ('', 'posts/1/', 'posts/1/edit/', 'profile/leo/follow/',
+             'group/cats/feed/atom/', 'groups/api/', 'changes/')
+
+    def build(self, resolver_class):
+        return resolver_class(
+            RoutePattern('', is_endpoint=False), 'posts.urls',
+            app_name='posts', namespace='posts')
+
+    def test_same_matches(self):
+        """Разбор совпадает с обычным URLResolver."""
+        plain = self.build(URLResolver)
+        prefix = self.build(PrefixURLResolver)
+        for path in self.PATHS:
+            with self.subTest(path=path):
+                expected = plain.resolve(path)
+                match = prefix.resolve(path)
+                self.assertEqual(match.view_name, expected.view_name)
+                self.assertEqual(match.kwargs, expected.kwargs)
+
+    def test_match_not_shared(self):
+        """Каждый разбор возвращает свой ResolverMatch."""
+        prefix = self.build(PrefixURLResolver)
+        first = prefix.resolve('posts/1/')
+        first.kwargs['post_id'] = 2
+        self.assertIsNot(prefix.resolve('posts/1/'), first)
+        self.assertEqual(prefix.resolve('posts/1/').kwargs, {'post_id': 1})
+
+    def test_not_found(self):
+        prefix = self.build(PrefixURLResolver)
+        for path in ('no/such/page/', 'posts/x/', 'wp-login.php'):
+            with self.subTest(path=path):
+                with self.assertRaises(Resolver404):
+                    prefix.resolve(path)
+
+    def test_single_posts_mount(self):
+        self.assertEqual(
+            resolve('/group/cats/').view_name, 'posts:group_list')
+        with self.assertRaises(Resolver404):
+            resolve('/group/cats/group/cats/')
+
+
+class MetricsTests(TestCase):
+    def test_endpoint(self):
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        for line in (
+            '# TYPE yatube_http_request_duration_seconds histogram',
+            'yatube_http_requests_total{status="200",view="posts:index"}',
+            'yatube_http_request_db_queries_bucket{view="posts:index",'
+            'le="+Inf"}',
+            'yatube_cache_requests_total{family="index_page",',
+        ):
+            self.assertIn(line, body)
+
+    def test_endpoint_hidden(self):
+        response = self.client.get(
+            reverse('metrics'), REMOTE_ADDR='203.0.113.1')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_endpoint_token(self):
+        """С токеном адрес прокси не открывает метрики."""
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(
+            url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 404)
+        response = self.client.get(
+            url, HTTP_AUTHORIZATION='Bearer s3cret',
+            REMOTE_ADDR='203.0.113.1')
+        self.assertEqual(response.status_code, 200)
+
+    def test_key_family(self):
+        self.assertEqual(key_family('post_fragment:1:2'), 'post_fragment')
+        self.assertEqual(
+            key_family("template.cache.'index_page'.abc"), 'index_page')
+        self.assertEqual(
+            key_family('django.contrib.sessions.cached_dbxyz'), 'session')
+        self.assertEqual(
+            key_family('sorl-thumbnail||image||0f1e2d3c'), 'thumbnails')
+        self.assertEqual(
+            key_family('sorl-thumbnail||thumbnails||0f1e2d3c'), 'thumbnails')
+
+
+class SharedCacheSettingsTests(SimpleTestCase):
+    def test_memcached_backend_builds(self):
+        """С YATUBE_MEMCACHED настройки дают рабочий бэкенд memcached
+        и сессии cached_db."""
+        with mock.patch.dict(os.environ, YATUBE_MEMCACHED='127.0.0.1:1'):
+            os.environ.pop('YATUBE_SESSION_ENGINE', None)
+            config = runpy.run_path(yatube_settings.__file__)
+        self.assertTrue(config['SHARED_CACHE'])
+        self.assertEqual(
+            config['SESSION_ENGINE'],
+            'django.contrib.sessions.backends.cached_db')
+        options = dict(config['CACHES']['default'])
+        backend = _create_cache(options.pop('BACKEND'), **options)
+        self.assertIsInstance(backend, MetricsMemcachedCache)
+        # Сервера по этому адресу нет: клиент отвечает промахом.
+        self.assertIsNone(backend.get('missing'))
+
+
+class RegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def make_registry(self, started):
+        registry = Registry(self.directory)
+        registry.started = started
+        registry.counter('test_total', 'Счетчик')
+        registry.histogram('test_seconds', 'Гистограмма', (0.1, 1))
+        return registry
+
+    def test_processes_aggregated(self):
+        """Снимки других процессов складываются со своими значениями."""
+        first = self.make_registry(1)
+        second = self.make_registry(2)
+        first.metrics['test_total'].inc(view='a')
+        second.metrics['test_total'].inc(2, view='a')
+        first.metrics['test_seconds'].observe(0.05)
+        second.metrics['test_seconds'].observe(5)
+        second.flush(force=True)
+        body = first.render()
+        self.assertIn('test_total{view="a"} 3\n', body)
+        self.assertIn('test_seconds_bucket{le="0.1"} 1\n', body)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 2\n', body)
+        self.assertIn('test_seconds_sum 5.05\n', body)
+        self.assertIn('test_seconds_count 2\n', body)
+
+    def test_dead_processes_compacted(self):
+        """Снимки завершившихся процессов сливаются в один файл,
+        их значения остаются в сумме."""
+        first = self.make_registry(1)
+        for started in (2, 3):
+            registry = self.make_registry(started)
+            registry.metrics['test_total'].inc(view='a')
+            registry.flush(force=True)
+            os.rename(
+                registry.snapshot_path(),
+                os.path.join(self.directory, f'999999{started}-1.json'))
+        with mock.patch(
+                'core.metrics.process_alive', lambda pid: pid == os.getpid()):
+            body = first.render()
+            self.assertIn('test_total{view="a"} 2\n', body)
+            self.assertEqual(
+                sorted(name for name in os.listdir(self.directory)
+                       if name.endswith('.json')),
+                ['retired.json'])
+            self.assertEqual(body, first.render())
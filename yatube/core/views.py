@@ -1,4 +1,11 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+
+from .metrics import REGISTRY
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
 
 
 def page_not_found(request, exception):
@@ -15,3 +22,21 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def metrics_allowed(request):
+    """С METRICS_TOKEN нужен заголовок Authorization с этим токеном,
+    без него - адрес из METRICS_ALLOWED_IPS."""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        return constant_time_compare(
+            request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}')
+    return request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+
+
+def metrics(request):
+    """Метрики в формате Prometheus, см. metrics_allowed."""
+    if not metrics_allowed(request):
+        raise Http404
+    return HttpResponse(
+        REGISTRY.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,126 @@
+"""Удаление пользователя со всеми его постами, комментариями и подписками.
+
+Обычный user.delete() через Collector загружает в память каждый связанный
+объект и вызывает для него сигналы. Здесь строки удаляются пачками
+по первичному ключу без загрузки объектов, каждая пачка в своей короткой
+транзакции, а то, что делали бы сигналы, выполняется один раз на пачку
+или на все удаление. Прерванное удаление можно просто запустить снова.
+"""
+from django.db import transaction
+from django.db.models import Q
+
+from .changes import record_changes
+from .feeds import touch_feeds
+from .fragments import author_stamp, invalidate_post_fragments
+from .groups import refresh_group_stats
+from .media import release_images_in_background
+from .models import (
+    ArchivedComment, ArchivedPost, Change, Comment, Follow, Post)
+from .partitions import touch_follows, touch_partitions
+from .ranking import compute_hot
+
+DELETE_BATCH_SIZE = 1000
+
+
+def _delete_in_batches(queryset, batch_size, fields=(), on_batch=None,
+                       log=True):
+    """Удаляет строки queryset пачками и, если log, пишет удаление
+    в журнал.
+
+    on_batch получает кортежи (pk, *fields) каждой пачки и вызывается
+    в той же транзакции. Каждая пачка читается после pk предыдущей,
+    чтобы не просматривать заново строки, не подходящие под фильтр.
+    Возвращает число удаленных строк.
+    """
+    model = queryset.model
+    deleted = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            rows = list(queryset.filter(pk__gt=last_pk).order_by(
+                'pk').values_list('pk', *fields)[:batch_size])
+            if not rows:
+                return deleted
+            pks = [row[0] for row in rows]
+            last_pk = pks[-1]
+            if on_batch is not None:
+                on_batch(rows)
+            if log:
+                record_changes(Change.DELETE, model, pks)
+            batch = model.objects.filter(pk__in=pks)
+            # Сигналы и каскад заменены обработкой выше.
+            batch._raw_delete(batch.db)
+        deleted += len(rows)
+
+
+def recompute_hot(post_ids, batch_size=DELETE_BATCH_SIZE):
+    """Пересчитывает рейтинг постов по оставшимся комментариям,
+    удаленные посты пропускаются."""
+    post_ids = sorted(post_ids)
+    for start in range(0, len(post_ids), batch_size):
+        posts = list(Post.objects.filter(
+            pk__in=post_ids[start:start + batch_size]).only('pk', 'pub_date'))
+        dates = {}
+        for post_id, pub_date in Comment.objects.filter(
+                post__in=posts).values_list('post_id', 'pub_date'):
+            dates.setdefault(post_id, []).append(pub_date)
+        for post in posts:
+            post.hot = compute_hot(post.pub_date, dates.get(post.pk, ()))
+        Post.objects.bulk_update(posts, ['hot'])
+
+
+def delete_account(user, batch_size=DELETE_BATCH_SIZE):
+    """Удаляет пользователя и все, что ему принадлежит.
+
+    Рейтинг постов, которые он комментировал, и статистика групп его
+    постов пересчитываются один раз в конце, а файлы картинок удаляются
+    в фоне после коммита.
+    Возвращает число удаленных строк по моделям.
+    """
+    commented = set()
+    groups = set()
+    images = []
+
+    def collect_commented(rows):
+        commented.update(post_id for _, post_id in rows)
+
+    def collect_images(rows):
+        images.extend(image for _, image in rows if image)
+
+    def drop_follows(rows):
+        touch_follows({user_id for _, user_id in rows})
+
+    def drop_posts(rows):
+        invalidate_post_fragments(
+            ((pk, updated_at) for pk, updated_at, _, _, _ in rows),
+            author_stamp(user))
+        images.extend(image for _, _, image, _, _ in rows if image)
+        groups.update(group_id for _, _, _, group_id, _ in rows)
+        touch_partitions({pub_date for *_, pub_date in rows})
+        touch_feeds()
+
+    stats = {
+        'comments': _delete_in_batches(
+            Comment.objects.filter(Q(author=user) | Q(post__author=user)),
+            batch_size, ('post_id',), collect_commented),
+        'follows': _delete_in_batches(
+            Follow.objects.filter(Q(user=user) | Q(author=user)),
+            batch_size, ('user_id',), drop_follows),
+        'posts': _delete_in_batches(
+            Post.objects.filter(author=user),
+            batch_size, ('updated_at', 'image', 'group_id', 'pub_date'),
+            drop_posts),
+        'archived_comments': _delete_in_batches(
+            ArchivedComment.objects.filter(
+                Q(author=user) | Q(post__author=user)),
+            batch_size, log=False),
+        'archived_posts': _delete_in_batches(
+            ArchivedPost.objects.filter(author=user),
+            batch_size, ('image',), collect_images, log=False),
+    }
+    recompute_hot(commented, batch_size)
+    refresh_group_stats(groups)
+    with transaction.atomic():
+        release_images_in_background(images)
+        user.delete()
+    return stats
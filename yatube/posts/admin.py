@@ -1,13 +1,52 @@
+from hashlib import md5
+
 from django.contrib import admin
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
 from .models import Post, Group, Comment
 
+ADMIN_COUNT_TIMEOUT = 60
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, который берет число объектов из кэша.
+
+    Точный COUNT(*) по большой таблице выполняется не чаще раза
+    в ADMIN_COUNT_TIMEOUT секунд для каждого набора фильтров.
+    """
+
+    @cached_property
+    def count(self):
+        query = str(self.object_list.query)
+        key = f'admin_count:{md5(query.encode()).hexdigest()}'
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, ADMIN_COUNT_TIMEOUT)
+        return count
+
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
     empty_value_display = '-пусто-'
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs)
+        if db_field.name == 'group':
+            # Список групп загружается один раз на страницу,
+            # а не для каждой строки list_editable.
+            formfield.choices = list(formfield.choices)
+        return formfield
 
 
 admin.site.register(Post, PostAdmin)
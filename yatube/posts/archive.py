@@ -0,0 +1,138 @@
+"""Архив старых постов.
+
+Посты старше заданного возраста вместе с комментариями переносятся
+в таблицы ArchivedPost и ArchivedComment, так что Post и Comment, по
+которым строятся все ленты, остаются небольшими. Страница поста и профиль
+автора читают архив, когда в рабочих таблицах записи нет.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef
+from django.http import Http404
+from django.utils import timezone
+
+from core.models import SubqueryCount
+
+from .feeds import touch_feeds
+from .groups import refresh_group_stats
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+from .partitions import touch_partitions
+
+ARCHIVE_AFTER_DAYS = getattr(settings, 'POSTS_ARCHIVE_AFTER_DAYS', 365)
+ARCHIVE_BATCH_SIZE = 500
+POST_FIELDS = (
+    'id', 'text', 'author_id', 'group_id', 'image', 'image_width',
+    'image_height', 'image_size', 'image_format', 'image_placeholder',
+    'pub_date', 'updated_at',
+)
+COMMENT_FIELDS = (
+    'id', 'post_id', 'author_id', 'text', 'pub_date', 'updated_at',
+)
+
+
+def archive_cutoff(days=ARCHIVE_AFTER_DAYS):
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_posts(before, batch_size=ARCHIVE_BATCH_SIZE):
+    """Переносит в архив посты, опубликованные раньше before.
+
+    Каждая пачка постов с их комментариями переносится в своей
+    транзакции. Возвращает число перенесенных постов.
+    """
+    moved = 0
+    old_posts = Post.objects.filter(pub_date__lt=before).order_by('pk')
+    while True:
+        with transaction.atomic():
+            posts = list(old_posts.values(*POST_FIELDS)[:batch_size])
+            if not posts:
+                return moved
+            pks = [post['id'] for post in posts]
+            ArchivedPost.objects.bulk_create(
+                ArchivedPost(**post) for post in posts)
+            comments = Comment.objects.filter(post_id__in=pks)
+            ArchivedComment.objects.bulk_create(
+                (ArchivedComment(**comment)
+                 for comment in comments.values(*COMMENT_FIELDS).iterator()),
+                batch_size=batch_size)
+            # Файлы картинок остаются на месте: на них ссылается архив.
+            comments._raw_delete(comments.db)
+            batch = Post.objects.filter(pk__in=pks)
+            batch._raw_delete(batch.db)
+            refresh_group_stats({post['group_id'] for post in posts})
+            touch_feeds()
+        touch_partitions({post['pub_date'] for post in posts})
+        moved += len(posts)
+
+
+def author_posts_count(author):
+    """Число постов автора вместе с архивом, author - ссылка на его id
+    во внешнем запросе."""
+    return (
+        SubqueryCount(Post.objects.filter(author=author))
+        + SubqueryCount(ArchivedPost.objects.filter(author=author))
+    )
+
+
+def get_post_or_archived(post_id):
+    """Пост из рабочей таблицы, а если его там нет - из архива.
+
+    Автор, группа и число постов автора (author_posts_count) читаются
+    тем же запросом.
+    """
+    for model in (Post, ArchivedPost):
+        post = model.objects.select_related('author', 'group').annotate(
+            author_posts_count=author_posts_count(OuterRef('author')),
+        ).filter(pk=post_id).first()
+        if post is not None:
+            return post
+    raise Http404('Пост не найден')
+
+
+class ChainedPosts:
+    """Посты автора для пагинатора: сначала рабочие, затем архивные.
+
+    В архив попадают только посты старше любого рабочего, поэтому
+    склейка сохраняет порядок от новых к старым. Срез, попадающий в одну
+    из частей, читает только ее. Уже известные числа постов можно
+    передать, чтобы не считать их отдельными запросами.
+    """
+
+    def __init__(self, posts, archived, posts_count=None,
+                 archived_count=None):
+        self.posts = posts
+        self.archived = archived
+        self._counts = [posts_count, archived_count]
+
+    def count(self):
+        return self._posts_count + self._archived_count
+
+    @property
+    def _posts_count(self):
+        if self._counts[0] is None:
+            self._counts[0] = self.posts.count()
+        return self._counts[0]
+
+    @property
+    def _archived_count(self):
+        if self._counts[1] is None:
+            self._counts[1] = self.archived.count()
+        return self._counts[1]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        start, stop = item.start or 0, item.stop
+        split = self._posts_count
+        result = []
+        if start < split:
+            result.extend(self.posts[start:min(stop, split)])
+        if stop > split:
+            result.extend(
+                self.archived[max(start - split, 0):stop - split])
+        return result
@@ -0,0 +1,39 @@
+from .models import Change
+
+CHANGES_BATCH_SIZE = 500
+
+
+def record_changes(op, model, pks):
+    """Пишет в журнал одну операцию над набором объектов."""
+    Change.objects.bulk_create(
+        Change(op=op, model=model._meta.model_name, object_pk=pk)
+        for pk in pks
+    )
+
+
+def change_as_dict(change):
+    return {
+        'seq': change.seq,
+        'op': change.op,
+        'model': change.model,
+        'pk': change.object_pk,
+        'created': change.created.isoformat(),
+    }
+
+
+def read_changes(since=0, limit=CHANGES_BATCH_SIZE):
+    """Порция журнала после номера since."""
+    return list(Change.objects.filter(seq__gt=since)[:limit])
+
+
+def iter_changes(since=0, batch_size=CHANGES_BATCH_SIZE):
+    """Проходит журнал порциями, начиная после номера since.
+
+    В памяти держится не больше одной порции записей.
+    """
+    while True:
+        batch = read_changes(since, batch_size)
+        if not batch:
+            return
+        yield batch
+        since = batch[-1].seq
@@ -0,0 +1,125 @@
+import threading
+import time
+
+from django.db import transaction
+
+BATCH_WINDOW = 0.005
+MAX_BATCH_SIZE = 100
+# Сколько пачек ведущий пишет, прежде чем передать очередь следующему.
+MAX_LEADER_BATCHES = 1
+WAIT_TIMEOUT = 5
+
+
+class _PendingComment:
+    def __init__(self, comment):
+        self.comment = comment
+        self.saved = False
+        self.finished = False
+        self.lead = False
+        # Будит поток, когда комментарий записан или поток стал ведущим.
+        self.wake = threading.Event()
+
+
+class CommentWriter:
+    """Групповая запись комментариев внутри процесса.
+
+    Первый поток, пришедший с комментарием, становится ведущим: во время
+    всплеска он ждет BATCH_WINDOW секунд, забирает накопившиеся
+    комментарии и сохраняет их одной транзакцией, то есть за одну
+    блокировку записи SQLite. Записав max_leader_batches пачек, ведущий
+    передает очередь первому ждущему потоку, так что его собственный
+    ответ не задерживается на весь всплеск. Остальные потоки ждут
+    окончания транзакции со своим комментарием, поэтому после редиректа
+    он уже виден. Если групповая запись не удалась или ожидание
+    затянулось дольше wait_timeout, поток сохраняет свой комментарий сам.
+    """
+
+    def __init__(self, window=BATCH_WINDOW, max_batch_size=MAX_BATCH_SIZE,
+                 max_leader_batches=MAX_LEADER_BATCHES,
+                 wait_timeout=WAIT_TIMEOUT):
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.max_leader_batches = max_leader_batches
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._queue = []
+        self._leader_active = False
+        self._last_arrival = 0
+
+    def save(self, comment):
+        pending = _PendingComment(comment)
+        with self._lock:
+            now = time.monotonic()
+            burst = now - self._last_arrival < self.window
+            self._last_arrival = now
+            self._queue.append(pending)
+            is_leader = not self._leader_active
+            self._leader_active = True
+        if is_leader and burst:
+            time.sleep(self.window)
+        while not pending.finished:
+            if is_leader:
+                self._lead()
+            if not pending.wake.wait(self.wait_timeout):
+                with self._lock:
+                    if pending in self._queue and not pending.lead:
+                        # Ведущий так и не взял комментарий: пишем сами.
+                        self._queue.remove(pending)
+                        break
+                # Иначе комментарий уже в записываемой пачке или поток
+                # только что стал ведущим.
+            with self._lock:
+                is_leader = pending.lead
+                pending.lead = False
+                pending.wake.clear()
+        if not pending.saved:
+            comment.save()
+
+    def _hand_off(self):
+        """Передает очередь первому ждущему потоку или снимает признак
+        ведущего, если очередь пуста. Вызывается под блокировкой."""
+        if self._queue:
+            successor = self._queue[0]
+            successor.lead = True
+            successor.wake.set()
+        else:
+            self._leader_active = False
+
+    def _lead(self):
+        written = 0
+        try:
+            while True:
+                with self._lock:
+                    if not self._queue or written >= self.max_leader_batches:
+                        self._hand_off()
+                        return
+                    batch = self._queue[:self.max_batch_size]
+                    self._queue = self._queue[self.max_batch_size:]
+                written += 1
+                self._write(batch)
+        except BaseException:
+            with self._lock:
+                self._hand_off()
+            raise
+
+    def _write(self, batch):
+        try:
+            with transaction.atomic():
+                for pending in batch:
+                    pending.comment.save()
+        except Exception:
+            # Любая ошибка пачки, в том числе из обработчиков сигналов:
+            # каждый поток повторит запись сам и получит свою ошибку.
+            for pending in batch:
+                pending.comment.pk = None
+                pending.comment._state.adding = True
+        else:
+            for pending in batch:
+                pending.saved = True
+        finally:
+            for pending in batch:
+                pending.finished = True
+                pending.wake.set()
+
+
+comment_writer = CommentWriter()
@@ -0,0 +1,175 @@
+import time
+from calendar import timegm
+from hashlib import md5
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from core.cache import shared_cache
+from users.resolver import get_user_id_or_404
+
+from .models import Group, Post, User
+
+FEED_ITEMS = 20
+FEED_CACHE_TIMEOUT = 60 * 60
+FEED_VERSION_KEY = 'feed_version'
+
+
+def _set_feed_version():
+    cache.set(FEED_VERSION_KEY, time.time(), None)
+
+
+def touch_feeds():
+    """Меняет версию лент сразу и еще раз после коммита, чтобы документ,
+    собранный до коммита по старым постам, тоже устарел."""
+    _set_feed_version()
+    transaction.on_commit(_set_feed_version)
+
+
+def feed_version():
+    version = cache.get(FEED_VERSION_KEY)
+    if version is None:
+        cache.add(FEED_VERSION_KEY, time.time(), None)
+        version = cache.get(FEED_VERSION_KEY)
+    return version
+
+
+class PostsFeed(Feed):
+    """Лента последних постов с поддержкой условных запросов.
+
+    От версии ленты считаются ETag и Last-Modified, и под ней же в кэше
+    лежит готовый документ. Сохранение или удаление поста меняет версию,
+    поэтому устаревший документ больше не отдается.
+    """
+    title = 'Yatube: последние обновления'
+    description = 'Новые посты на сайте'
+
+    def __call__(self, request, *args, **kwargs):
+        obj = self.get_object(request, *args, **kwargs)
+        version, last_modified = self.version(obj)
+        version = md5(f'{request.path}:{version}'.encode()).hexdigest()
+        etag = quote_etag(version)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            return response
+        key = f'feed:{version}'
+        content = cache.get(key)
+        if content is None:
+            response = super().__call__(request, *args, **kwargs)
+            cache.set(key, response.content, FEED_CACHE_TIMEOUT)
+        else:
+            response = HttpResponse(
+                content, content_type=self.feed_type.content_type)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def version(self, obj):
+        """Версия ленты и время ее последнего изменения.
+
+        С общим кэшем это отметка, которую меняет каждая запись постов,
+        и опрос ленты не читает посты. Без общего кэша отметки процессов
+        расходятся, и версия считается по FEED_ITEMS постам, которые
+        попадут в ленту: их id и последнему изменению.
+        """
+        if shared_cache():
+            version = feed_version()
+            return version, int(version)
+        rows = list(self.post_list(obj).values_list(
+            'pk', 'updated_at')[:FEED_ITEMS])
+        if not rows:
+            return 'empty', None
+        latest = max(updated_at for _, updated_at in rows)
+        ids = ','.join(str(pk) for pk, _ in rows)
+        return f'{ids}:{latest}', timegm(latest.utctimetuple())
+
+    def link(self, obj):
+        return reverse('posts:index')
+
+    def post_list(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return self.post_list(obj).select_related(
+            'author', 'group')[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return str(item)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=(item.pk,))
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+
+class GroupPostsFeed(PostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj):
+        return f'Yatube: записи сообщества {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=(obj.slug,))
+
+    def post_list(self, obj):
+        return obj.posts.all()
+
+
+class AuthorPostsFeed(PostsFeed):
+    def get_object(self, request, username):
+        # Имя и id берутся из кэша имен, как в профиле.
+        return User(pk=get_user_id_or_404(username), username=username)
+
+    def title(self, obj):
+        return f'Yatube: посты пользователя {obj.username}'
+
+    def description(self, obj):
+        return f'Все посты пользователя {obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=(obj.username,))
+
+    def post_list(self, obj):
+        return obj.posts.all()
+
+
+class AtomPostsFeed(PostsFeed):
+    feed_type = Atom1Feed
+    subtitle = PostsFeed.description
+
+
+class AtomGroupPostsFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return obj.description
+
+
+class AtomAuthorPostsFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return f'Все посты пользователя {obj.username}'
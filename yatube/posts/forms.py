@@ -1,14 +1,41 @@
+from functools import partial
+
+from .groups import GROUP_SELECT_LIMIT, group_choices, group_index
 from .models import Post, Group, Comment
 from django import forms
+from django.urls import reverse
+
+
+class GroupSelect(forms.Select):
+    """Список групп, который при большом их числе дополняется
+    подсказками по названию."""
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        if len(group_index()) > GROUP_SELECT_LIMIT:
+            context['widget']['attrs']['data-autocomplete'] = reverse(
+                'posts:groups_autocomplete')
+        return context
 
 
 class PostForm(forms.ModelForm):
-    group = forms.ModelChoiceField(Group.objects.all(), required=False)
+    # Проверка выбранной группы - запрос по первичному ключу,
+    # а варианты для списка берутся из индекса групп.
+    group = forms.ModelChoiceField(
+        Group.objects.only('id', 'title'), required=False,
+        widget=GroupSelect)
 
     class Meta:
         model = Post
         fields = ('text', 'group', 'image')
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        field = self.fields['group']
+        selected = self.data.get('group') if self.is_bound else (
+            self.initial.get('group'))
+        field.choices = partial(group_choices, selected, field.empty_label)
+
     def clean_text(self):
         data = self.cleaned_data['text']
         if data == '':
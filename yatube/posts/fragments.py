@@ -0,0 +1,51 @@
+from hashlib import md5
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+FRAGMENT_TEMPLATE = 'posts/includes/post_list.html'
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+
+
+def fragment_stamp(updated_at):
+    """Отметка версии поста для ключа кэша."""
+    return int(updated_at.timestamp() * 1_000_000)
+
+
+def author_stamp(author):
+    """Отметка имени автора для ключа кэша."""
+    name = f'{author.username}:{author.first_name}:{author.last_name}'
+    return md5(name.encode()).hexdigest()[:12]
+
+
+def fragment_key(post_id, stamp, author):
+    return f'post_fragment:{post_id}:{stamp}:{author}'
+
+
+def get_post_fragment(post):
+    """Возвращает готовый HTML карточки поста.
+
+    Карточка рендерится при первом обращении и дальше берется из кэша,
+    поэтому страницы со списками постов собираются из готовых строк.
+    Ключ содержит updated_at и имя автора, так что после редактирования
+    поста или переименования автора старая карточка перестает
+    использоваться во всех процессах, а не только в том, где прошла
+    запись.
+    """
+    key = fragment_key(
+        post.pk, fragment_stamp(post.updated_at), author_stamp(post.author))
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(FRAGMENT_TEMPLATE, {'post': post})
+        cache.set(key, html, FRAGMENT_TIMEOUT)
+    return mark_safe(html)
+
+
+def invalidate_post_fragments(posts, author):
+    """Удаляет карточки постов автора с отметкой author,
+    posts - пары (id, updated_at)."""
+    cache.delete_many([
+        fragment_key(post_id, fragment_stamp(updated_at), author)
+        for post_id, updated_at in posts
+    ])
@@ -0,0 +1,193 @@
+"""Каталог групп по заранее посчитанной статистике GroupStats.
+
+Новый пост прибавляет единицу к счетчику своей группы и, если он
+новее, становится последним. Удаление поста или перенос в другую
+группу вычитает единицу, а последний пост ищется заново только если
+ушел именно он. Массовые операции без сигналов (архивация, удаление
+аккаунта) пересчитывают затронутые группы целиком.
+
+Каталог читается постранично запросом, упорядоченным по индексу
+числа постов. С общим кэшем страницы кэшируются под версией каталога,
+которую меняет каждое изменение статистики; без общего кэша сброс
+дошел бы только до одного процесса, и страницы не кэшируются.
+
+Для выбора группы в форме поста здесь же держится индекс названий:
+пары (id, title), отсортированные для поиска по префиксу.
+"""
+import time
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+
+from core.cache import shared_cache
+
+from .models import Group, GroupStats, Post
+
+GROUP_DIRECTORY_KEY = 'group_directory_version'
+GROUP_DIRECTORY_TIMEOUT = 60 * 60
+GROUP_INDEX_VERSION_KEY = 'group_index_version'
+GROUP_SELECT_LIMIT = 200
+AUTOCOMPLETE_LIMIT = 20
+
+GROUP_INDEX_TTL = 60
+
+# Индекс строится один раз на процесс и перестраивается, когда меняется
+# версия в кэше или индексу больше GROUP_INDEX_TTL секунд: без общего
+# кэша другие процессы узнают о новой группе только так.
+_group_index = {}
+
+
+def _bump_group_directory():
+    cache.set(GROUP_DIRECTORY_KEY, time.time(), None)
+
+
+def drop_group_directory():
+    """Меняет версию каталога сразу и еще раз после коммита."""
+    _bump_group_directory()
+    transaction.on_commit(_bump_group_directory)
+
+
+def refresh_group_stats(group_ids):
+    """Пересчитывает статистику групп по рабочей таблице постов."""
+    for group_id in set(group_ids) - {None}:
+        posts = Post.objects.filter(group_id=group_id)
+        last = posts.order_by('-pub_date', '-pk').values_list(
+            'pk', 'pub_date').first() or (None, None)
+        GroupStats.objects.update_or_create(group_id=group_id, defaults={
+            'posts_count': posts.count(),
+            'last_post_id': last[0],
+            'last_post_at': last[1],
+        })
+    drop_group_directory()
+
+
+def add_group_post(group_id, post_id, pub_date):
+    updated = GroupStats.objects.filter(group_id=group_id).update(
+        posts_count=F('posts_count') + 1)
+    if not updated:
+        refresh_group_stats([group_id])
+        return
+    GroupStats.objects.filter(
+        Q(last_post_at__isnull=True) | Q(last_post_at__lte=pub_date),
+        group_id=group_id,
+    ).update(last_post_id=post_id, last_post_at=pub_date)
+    drop_group_directory()
+
+
+def remove_group_post(group_id, post_id):
+    stats = GroupStats.objects.filter(group_id=group_id)
+    stats.filter(posts_count__gt=0).update(posts_count=F('posts_count') - 1)
+    if stats.filter(last_post_id=post_id).exists():
+        refresh_group_stats([group_id])
+        return
+    drop_group_directory()
+
+
+def group_directory():
+    """Группы со статистикой: самые наполненные сначала."""
+    return Group.objects.order_by(
+        F('stats__posts_count').desc(nulls_last=True), 'title',
+    ).values(
+        'title', 'slug', 'description',
+        posts_count=Coalesce('stats__posts_count', 0),
+        last_post_at=F('stats__last_post_at'),
+        last_post_id=F('stats__last_post_id'),
+    )
+
+
+def group_directory_page(number, per_page):
+    """Страница каталога групп, как Paginator.get_page(number)."""
+    paginator = Paginator(group_directory(), per_page)
+    if not shared_cache():
+        return paginator.get_page(number)
+    version = cache.get(GROUP_DIRECTORY_KEY)
+    if version is None:
+        cache.add(GROUP_DIRECTORY_KEY, time.time(), None)
+        version = cache.get(GROUP_DIRECTORY_KEY)
+    count_key = f'group_directory_count:{version}'
+    count = cache.get(count_key)
+    if count is None:
+        cache.set(count_key, paginator.count, GROUP_DIRECTORY_TIMEOUT)
+    else:
+        paginator.count = count
+    page = paginator.get_page(number)
+    key = f'group_directory_page:{version}:{per_page}:{page.number}'
+    rows = cache.get(key)
+    if rows is None:
+        rows = list(page.object_list)
+        cache.set(key, rows, GROUP_DIRECTORY_TIMEOUT)
+    page.object_list = rows
+    return page
+
+
+class GroupIndex:
+    """Группы, отсортированные по названию без учета регистра."""
+
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda row: (row[1].casefold(), row[0]))
+        self.keys = [title.casefold() for _, title in self.rows]
+        self.titles = dict(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def startswith(self, prefix, limit=AUTOCOMPLETE_LIMIT):
+        """Не больше limit групп, чье название начинается с prefix."""
+        prefix = prefix.casefold()
+        start = bisect_left(self.keys, prefix)
+        result = []
+        for position in range(start, min(start + limit, len(self.keys))):
+            if not self.keys[position].startswith(prefix):
+                break
+            result.append(self.rows[position])
+        return result
+
+
+def _bump_group_index():
+    cache.set(GROUP_INDEX_VERSION_KEY, time.time(), None)
+
+
+def touch_group_index():
+    """Меняет версию индекса сразу и еще раз после коммита: индекс,
+    построенный до коммита по старым строкам, тоже устареет."""
+    _bump_group_index()
+    transaction.on_commit(_bump_group_index)
+
+
+def group_index():
+    version = cache.get(GROUP_INDEX_VERSION_KEY)
+    if version is None:
+        cache.add(GROUP_INDEX_VERSION_KEY, time.time(), None)
+        version = cache.get(GROUP_INDEX_VERSION_KEY)
+    now = time.monotonic()
+    cached = _group_index.get('index')
+    if (cached is None or cached[0] != version
+            or now - cached[1] > GROUP_INDEX_TTL):
+        cached = version, now, GroupIndex(
+            Group.objects.order_by().values_list('pk', 'title'))
+        _group_index['index'] = cached
+    return cached[2]
+
+
+def group_choices(selected=None, empty_label='---------'):
+    """Варианты для выбора группы без загрузки объектов Group.
+
+    Если групп больше GROUP_SELECT_LIMIT, в список попадают только
+    первые из них и выбранная, остальные находятся подсказками.
+    """
+    index = group_index()
+    rows = index.rows
+    if len(rows) > GROUP_SELECT_LIMIT:
+        rows = rows[:GROUP_SELECT_LIMIT]
+        try:
+            selected = int(selected)
+        except (TypeError, ValueError):
+            selected = None
+        if selected in index.titles and (
+                selected, index.titles[selected]) not in rows:
+            rows = [(selected, index.titles[selected])] + rows
+    return [('', empty_label)] + rows
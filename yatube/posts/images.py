@@ -0,0 +1,79 @@
+import base64
+from io import BytesIO
+
+from django.conf import settings
+
+PLACEHOLDER_SIZE = (16, 16)
+PLACEHOLDER_QUALITY = 40
+
+
+def read_image_metadata(file):
+    """Размеры, формат, объем и маленькая размытая копия картинки.
+
+    Копия хранится как data URI и показывается вместо картинки,
+    пока та не загрузилась.
+    """
+    # Pillow нужен только при загрузке картинки и не замедляет запуск.
+    from PIL import Image
+
+    file.seek(0, 2)
+    size = file.tell()
+    file.seek(0)
+    with Image.open(file) as image:
+        width, height = image.size
+        image_format = image.format or ''
+        preview = image.convert('RGB')
+    preview.thumbnail(PLACEHOLDER_SIZE)
+    buffer = BytesIO()
+    preview.save(buffer, 'JPEG', quality=PLACEHOLDER_QUALITY)
+    file.seek(0)
+    placeholder = base64.b64encode(buffer.getvalue()).decode()
+    return {
+        'image_width': width,
+        'image_height': height,
+        'image_size': size,
+        'image_format': image_format,
+        'image_placeholder': f'data:image/jpeg;base64,{placeholder}',
+    }
+
+
+def read_image_metadata_from_path(path):
+    """Вариант для пула процессов: None, если файла нет или это
+    не картинка."""
+    try:
+        with open(path, 'rb') as file:
+            return read_image_metadata(file)
+    except (OSError, ValueError):
+        return None
+
+
+def thumbnail_size(width, height, geometry, crop=False, upscale=None):
+    """Размер миниатюры sorl-thumbnail с геометрией 'ШxВ' по сохраненным
+    размерам картинки, без чтения файла или хранилища миниатюр.
+
+    Повторяет масштабирование и обрезку движка sorl; upscale по умолчанию,
+    как и в sorl, берется из THUMBNAIL_UPSCALE. None, если размеры
+    картинки неизвестны.
+    """
+    if not width or not height:
+        return None
+    if upscale is None:
+        upscale = getattr(settings, 'THUMBNAIL_UPSCALE', True)
+    box_width, box_height = (int(side) for side in geometry.split('x'))
+    factors = (box_width / width, box_height / height)
+    factor = max(factors) if crop else min(factors)
+    if factor < 1 or upscale:
+        width, height = int(round(width * factor)), int(round(height * factor))
+    if crop:
+        width, height = min(width, box_width), min(height, box_height)
+    return width, height
+
+
+EMPTY_METADATA = {
+    'image_width': None,
+    'image_height': None,
+    'image_size': None,
+    'image_format': '',
+    'image_placeholder': '',
+}
+METADATA_FIELDS = list(EMPTY_METADATA)
@@ -0,0 +1,294 @@
+"""Синтетическая нагрузка на yatube: наполнение базы и смешанный поток
+запросов к основным страницам."""
+import random
+import statistics
+import time
+from collections import defaultdict
+from urllib.parse import urljoin
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .groups import refresh_group_stats
+from .models import Comment, Follow, Group, Post, User
+
+LOADTEST_PASSWORD = 'loadtest-password'
+BATCH_SIZE = 500
+SAMPLE_SIZE = 1000
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+ROUTE_WEIGHTS = {
+    'index': 40,
+    'group_list': 15,
+    'profile': 15,
+    'post_detail': 15,
+    'follow_index': 5,
+    'add_comment': 5,
+    'create_post': 5,
+}
+
+
+def power_law_weights(count, alpha):
+    """Веса 1 / rank^alpha: немногие авторы получают большую часть
+    подписок и постов."""
+    return [1 / (rank ** alpha) for rank in range(1, count + 1)]
+
+
+def _bulk_create(model, objects):
+    model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+
+
+def seed(users, groups, posts, follows, comments, alpha=1.2, prefix='load',
+         rng=None):
+    """Наполняет базу синтетическими данными пакетными вставками.
+
+    Авторы постов и цели подписок выбираются по степенному закону.
+    bulk_create не вызывает сигналы. Статистика групп пересчитывается
+    явно, а журнал изменений, кэши и рейтинг hot постов (комментарии
+    его не поднимают) для этих данных остаются устаревшими.
+    """
+    rng = rng or random.Random()
+    password = make_password(LOADTEST_PASSWORD)
+    start = User.objects.filter(
+        username__startswith=f'{prefix}_user_').count()
+    _bulk_create(User, (
+        User(username=f'{prefix}_user_{i}', password=password,
+             first_name='Нагрузка', last_name=str(i))
+        for i in range(start, start + users)
+    ))
+    start = Group.objects.filter(slug__startswith=f'{prefix}-group-').count()
+    _bulk_create(Group, (
+        Group(title=f'Группа {i}', slug=f'{prefix}-group-{i}',
+              description='Группа для нагрузочного теста')
+        for i in range(start, start + groups)
+    ))
+    user_ids = list(User.objects.filter(
+        username__startswith=f'{prefix}_user_').values_list('pk', flat=True))
+    group_ids = list(Group.objects.filter(
+        slug__startswith=f'{prefix}-group-').values_list('pk', flat=True))
+    weights = power_law_weights(len(user_ids), alpha)
+    authors = rng.choices(user_ids, weights, k=posts)
+    _bulk_create(Post, (
+        Post(author_id=author_id, group_id=rng.choice(group_ids + [None]),
+             text=f'Пост нагрузочного теста №{i}')
+        for i, author_id in enumerate(authors)
+    ))
+    refresh_group_stats(group_ids)
+    pairs = set()
+    for _ in range(follows * 3):
+        if len(pairs) >= follows:
+            break
+        user_id = rng.choice(user_ids)
+        author_id = rng.choices(user_ids, weights)[0]
+        if user_id != author_id:
+            pairs.add((user_id, author_id))
+    existing = set(Follow.objects.values_list('user_id', 'author_id'))
+    _bulk_create(Follow, (
+        Follow(user_id=user_id, author_id=author_id)
+        for user_id, author_id in pairs - existing
+    ))
+    post_ids = list(Post.objects.filter(
+        author_id__in=user_ids).values_list('pk', flat=True))
+    _bulk_create(Comment, (
+        Comment(post_id=rng.choice(post_ids), author_id=rng.choice(user_ids),
+                text=f'Комментарий нагрузочного теста №{i}')
+        for i in range(comments)
+    ))
+
+
+def sample_targets(prefix='load'):
+    """Небольшие выборки объектов, к которым обращается нагрузка."""
+    return {
+        'usernames': list(User.objects.filter(
+            username__startswith=f'{prefix}_user_').values_list(
+                'username', flat=True)[:SAMPLE_SIZE]),
+        'slugs': list(Group.objects.values_list(
+            'slug', flat=True)[:SAMPLE_SIZE]),
+        'post_ids': list(Post.objects.values_list(
+            'pk', flat=True)[:SAMPLE_SIZE]),
+    }
+
+
+class InProcessTransport:
+    """Запросы к WSGI-приложению в том же процессе через тестовый клиент.
+
+    Считает SQL-запросы каждого обращения.
+    """
+
+    def __init__(self, username):
+        self.client = Client()
+        self.client.force_login(User.objects.get(username=username))
+
+    def request(self, method, path, data=None):
+        with CaptureQueriesContext(connection) as context:
+            if method == 'POST':
+                response = self.client.post(path, data)
+            else:
+                response = self.client.get(path)
+        return response.status_code, len(context.captured_queries)
+
+    def close(self):
+        connection.close()
+
+
+class HttpTransport:
+    """Запросы к запущенному серверу по HTTP."""
+
+    def __init__(self, username, base_url):
+        import requests
+
+        self.base_url = base_url
+        self.session = requests.Session()
+        login_url = urljoin(base_url, reverse('users:login'))
+        self.session.get(login_url)
+        self.session.post(login_url, data={
+            'username': username,
+            'password': LOADTEST_PASSWORD,
+            'csrfmiddlewaretoken': self.session.cookies.get('csrftoken'),
+        }, headers={'Referer': login_url})
+
+    def request(self, method, path, data=None):
+        url = urljoin(self.base_url, path)
+        if method == 'POST':
+            response = self.session.post(url, data=data, headers={
+                'X-CSRFToken': self.session.cookies.get('csrftoken', ''),
+                'Referer': url,
+            }, allow_redirects=False)
+        else:
+            response = self.session.get(url, allow_redirects=False)
+        return response.status_code, None
+
+    def close(self):
+        self.session.close()
+
+
+def pick_request(rng, targets):
+    """Случайный запрос смешанной нагрузки: (маршрут, метод, путь, данные)."""
+    route = rng.choices(
+        list(ROUTE_WEIGHTS), list(ROUTE_WEIGHTS.values()))[0]
+    if route == 'index':
+        return route, 'GET', reverse('posts:index'), None
+    if route == 'follow_index':
+        return route, 'GET', reverse('posts:follow_index'), None
+    if route == 'group_list':
+        slug = rng.choice(targets['slugs'])
+        return route, 'GET', reverse('posts:group_list', args=(slug,)), None
+    if route == 'profile':
+        username = rng.choice(targets['usernames'])
+        return route, 'GET', reverse('posts:profile', args=(username,)), None
+    if route == 'create_post':
+        return route, 'POST', reverse('posts:create_post'), {
+            'text': 'Новый пост нагрузочного теста'}
+    post_id = rng.choice(targets['post_ids'])
+    if route == 'add_comment':
+        return route, 'POST', reverse('posts:add_comment', args=(post_id,)), {
+            'text': 'Новый комментарий нагрузочного теста'}
+    return route, 'GET', reverse('posts:post_detail', args=(post_id,)), None
+
+
+def run_worker(targets, requests_count, base_url=None, seed_value=None):
+    """Выполняет requests_count запросов подряд и возвращает замеры
+    (маршрут, секунды, код ответа, число SQL-запросов)."""
+    rng = random.Random(seed_value)
+    username = rng.choice(targets['usernames'])
+    if base_url:
+        transport = HttpTransport(username, base_url)
+    else:
+        transport = InProcessTransport(username)
+    samples = []
+    try:
+        for _ in range(requests_count):
+            route, method, path, data = pick_request(rng, targets)
+            started = time.perf_counter()
+            try:
+                status, queries = transport.request(method, path, data)
+            except Exception:
+                status, queries = None, None
+            samples.append(
+                (route, time.perf_counter() - started, status, queries))
+    finally:
+        transport.close()
+    return samples
+
+
+def drop_inherited_connections():
+    """Дочерний процесс открывает свои соединения с базой, а
+    унаследованные от родителя просто забывает, не закрывая их."""
+    for conn in connections.all():
+        conn.connection = None
+
+
+def percentile(sorted_values, share):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * share))
+    return sorted_values[index]
+
+
+def histogram(latencies_ms):
+    buckets = dict.fromkeys(
+        [f'<={bound}ms' for bound in HISTOGRAM_BUCKETS_MS] + ['inf'], 0)
+    for value in latencies_ms:
+        for bound in HISTOGRAM_BUCKETS_MS:
+            if value <= bound:
+                buckets[f'<={bound}ms'] += 1
+                break
+        else:
+            buckets['inf'] += 1
+    return buckets
+
+
+def build_report(samples, elapsed, config):
+    """Сводка по маршрутам: пропускная способность, задержки,
+    гистограмма и SQL-запросы."""
+    by_route = defaultdict(list)
+    for sample in samples:
+        by_route[sample[0]].append(sample)
+    routes = {}
+    for route, route_samples in sorted(by_route.items()):
+        latencies = sorted(sample[1] * 1000 for sample in route_samples)
+        queries = [sample[3] for sample in route_samples
+                   if sample[3] is not None]
+        routes[route] = {
+            'requests': len(route_samples),
+            'errors': sum(
+                1 for sample in route_samples
+                if sample[2] is None or sample[2] >= 400),
+            'throughput_rps': round(len(route_samples) / elapsed, 2),
+            'latency_ms': {
+                'mean': round(statistics.mean(latencies), 3),
+                'p50': round(percentile(latencies, 0.5), 3),
+                'p90': round(percentile(latencies, 0.9), 3),
+                'p99': round(percentile(latencies, 0.99), 3),
+                'max': round(latencies[-1], 3),
+            },
+            'histogram': histogram(latencies),
+            'db_queries': {
+                'total': sum(queries),
+                'mean': round(statistics.mean(queries), 2),
+            } if queries else None,
+        }
+    return {
+        'config': config,
+        'elapsed_s': round(elapsed, 3),
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / elapsed, 2),
+        'routes': routes,
+    }
+
+
+def compare_reports(baseline, current):
+    """Изменение ключевых показателей по маршрутам относительно
+    прошлого прогона: {маршрут: {показатель: (было, стало)}}."""
+    result = {}
+    for route, stats in current['routes'].items():
+        old = baseline['routes'].get(route)
+        if old is None:
+            continue
+        result[route] = {
+            'throughput_rps': (old['throughput_rps'],
+                               stats['throughput_rps']),
+            'p50_ms': (old['latency_ms']['p50'], stats['latency_ms']['p50']),
+            'p99_ms': (old['latency_ms']['p99'], stats['latency_ms']['p99']),
+        }
+    return result
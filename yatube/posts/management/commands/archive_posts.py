@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.archive import (
+    ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, archive_cutoff, archive_posts)
+
+
+class Command(BaseCommand):
+    help = ('Переносит старые посты вместе с комментариями в архивные '
+            'таблицы, чтобы ленты работали с небольшими таблицами.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=ARCHIVE_AFTER_DAYS,
+            help='Архивировать посты старше стольких дней.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        moved = archive_posts(
+            archive_cutoff(options['days']), options['batch_size'])
+        self.stdout.write(f'Перенесено в архив постов: {moved}')
@@ -0,0 +1,56 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+
+from posts.images import METADATA_FIELDS, read_image_metadata_from_path
+from posts.models import Post
+
+BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = ('Заполняет размеры, формат, объем и превью картинок постов, '
+            'загруженных до появления этих полей. Файлы читаются '
+            'в пуле процессов, с --workers 1 - в этом же процессе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Число процессов, по умолчанию - число ядер.',
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        pending = Post.objects.exclude(image='').filter(
+            image_width__isnull=True).order_by('pk')
+        last_pk = 0
+        filled = skipped = 0
+        workers = options['workers']
+        # Один процесс читает сам: пул не нужен и не может запуститься
+        # из демонического процесса, например воркера test --parallel.
+        pool = (nullcontext() if workers == 1
+                else ProcessPoolExecutor(workers))
+        with pool as executor:
+            read_all = map if executor is None else executor.map
+            while True:
+                posts = list(pending.filter(pk__gt=last_pk).only(
+                    'pk', 'image')[:batch_size])
+                if not posts:
+                    break
+                last_pk = posts[-1].pk
+                paths = [post.image.path for post in posts]
+                results = read_all(read_image_metadata_from_path, paths)
+                updated = []
+                for post, metadata in zip(posts, results):
+                    if metadata is None:
+                        skipped += 1
+                        continue
+                    for field, value in metadata.items():
+                        setattr(post, field, value)
+                    updated.append(post)
+                Post.objects.bulk_update(updated, METADATA_FIELDS)
+                filled += len(updated)
+        self.stdout.write(
+            f'Заполнено: {filled}, пропущено (нет файла): {skipped}')
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.urls import reverse
+
+from core.asgi import MAX_WORKERS, WsgiToAsgi, build_environ
+from posts.loadtest import percentile
+
+
+def http_scope(path):
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': b'',
+        'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80),
+    }
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает один процесс в режиме WSGI (запросы по очереди, '
+            'как синхронный воркер) и в режиме ASGI с пулом потоков '
+            'при заданном числе одновременных запросов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', action='append',
+            help='Адрес для запросов, можно указать несколько раз. '
+                 'По умолчанию - главная страница.',
+        )
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--threads', type=int, default=MAX_WORKERS)
+
+    def handle(self, *args, **options):
+        app = get_wsgi_application()
+        paths = options['path'] or [reverse('posts:index')]
+        targets = [
+            paths[i % len(paths)] for i in range(options['requests'])
+        ]
+        results = {
+            'WSGI': self.bench_wsgi(app, targets),
+            'ASGI': asyncio.run(self.bench_asgi(
+                WsgiToAsgi(app, options['threads']), targets,
+                options['concurrency'])),
+        }
+        for mode, (elapsed, latencies, errors) in results.items():
+            latencies.sort()
+            self.stdout.write(
+                f'{mode}: {len(latencies) / elapsed:.1f} запросов/с, '
+                f'p50 {percentile(latencies, 0.5) * 1000:.1f} мс, '
+                f'p99 {percentile(latencies, 0.99) * 1000:.1f} мс, '
+                f'ошибок {errors}')
+
+    @staticmethod
+    def bench_wsgi(app, targets):
+        latencies = []
+        errors = 0
+        started = time.perf_counter()
+        for path in targets:
+            status = []
+            begin = time.perf_counter()
+            result = app(build_environ(http_scope(path), BytesIO()),
+                         lambda code, headers, exc_info=None:
+                         status.append(code))
+            try:
+                for _ in result:
+                    pass
+            finally:
+                result.close()
+            latencies.append(time.perf_counter() - begin)
+            errors += int(status[0].split()[0]) >= 400
+        return time.perf_counter() - started, latencies, errors
+
+    @staticmethod
+    async def bench_asgi(app, targets, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        errors = 0
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def request(path):
+            nonlocal errors
+            statuses = []
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+
+            async with semaphore:
+                begin = time.perf_counter()
+                await app(http_scope(path), receive, send)
+                latencies.append(time.perf_counter() - begin)
+            errors += statuses[0] >= 400
+
+        started = time.perf_counter()
+        await asyncio.gather(*(request(path) for path in targets))
+        elapsed = time.perf_counter() - started
+        app.executor.shutdown()
+        return elapsed, latencies, errors
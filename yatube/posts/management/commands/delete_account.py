@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.accounts import DELETE_BATCH_SIZE, delete_account
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = ('Удаляет пользователя вместе с постами, комментариями '
+            'и подписками пачками, не загружая их в память.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--batch-size', type=int, default=DELETE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден')
+        stats = delete_account(user, options['batch_size'])
+        self.stdout.write(
+            f'Удалено постов: {stats["posts"]}, '
+            f'комментариев: {stats["comments"]}, '
+            f'подписок: {stats["follows"]}')
@@ -0,0 +1,50 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand
+
+from posts.changes import CHANGES_BATCH_SIZE, change_as_dict, iter_changes
+
+
+class Command(BaseCommand):
+    help = ('Выгружает журнал изменений в формате JSON Lines, '
+            'начиная с сохраненной отметки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since', type=int, default=None,
+            help='Номер изменения, после которого начинать выгрузку.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с номером последнего выгруженного изменения. '
+                 'Читается при старте и обновляется после каждой порции.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=CHANGES_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        checkpoint = options['checkpoint']
+        since = options['since']
+        if since is None:
+            since = self.read_checkpoint(checkpoint)
+        for batch in iter_changes(since, options['batch_size']):
+            for change in batch:
+                self.stdout.write(json.dumps(change_as_dict(change)))
+            if checkpoint:
+                self.write_checkpoint(checkpoint, batch[-1].seq)
+
+    @staticmethod
+    def read_checkpoint(path):
+        if not path or not os.path.exists(path):
+            return 0
+        with open(path) as file:
+            return int(file.read().strip() or 0)
+
+    @staticmethod
+    def write_checkpoint(path, seq):
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as file:
+            file.write(str(seq))
+        os.replace(tmp_path, path)
@@ -0,0 +1,131 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.kvstores.base import add_prefix, del_prefix
+from sorl.thumbnail.models import KVStore
+
+from posts.media import RELEASE_GRACE, compact_key, iter_storage_files
+from posts.models import ArchivedPost, Post
+
+BATCH_SIZE = 1000
+WORKERS = 8
+
+
+class Command(BaseCommand):
+    help = ('Удаляет картинки, на которые не ссылается ни один пост, '
+            'и миниатюры sorl-thumbnail без исходных картинок.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только посчитать, ничего не удаляя.',
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=WORKERS)
+        parser.add_argument(
+            '--grace', type=int, default=RELEASE_GRACE,
+            help='Не трогать файлы моложе стольких секунд.',
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.verbosity = options['verbosity']
+        self.batch_size = options['batch_size']
+        deadline = time.time() - options['grace']
+        field = Post._meta.get_field('image')
+        referenced = set()
+        for model in (Post, ArchivedPost):
+            images = model.objects.exclude(image='').values_list(
+                'image', flat=True)
+            referenced.update(
+                compact_key(name)
+                for name in images.iterator(chunk_size=self.batch_size))
+        live_thumbnails, stale_sources = self.sweep_kvstore(referenced)
+        with ThreadPoolExecutor(options['workers']) as executor:
+            sources = self.sweep_files(
+                executor, field.storage, field.upload_to.rstrip('/'),
+                referenced, deadline)
+            thumbnails = self.sweep_files(
+                executor, default.storage,
+                thumbnail_settings.THUMBNAIL_PREFIX.rstrip('/'),
+                live_thumbnails, deadline)
+        verb = 'Будет удалено' if self.dry_run else 'Удалено'
+        self.stdout.write(
+            f'{verb}: картинок {sources[0]} ({sources[1]} байт), '
+            f'миниатюр {thumbnails[0]} ({thumbnails[1]} байт), '
+            f'записей sorl-thumbnail для {stale_sources} картинок')
+
+    def sweep_kvstore(self, referenced):
+        """Собирает имена живых миниатюр и удаляет записи sorl-thumbnail
+        картинок без ссылок. Записи читаются пачками по ключу, поэтому
+        удаление не сбивает обход."""
+        prefix = add_prefix('', 'image')
+        thumbnail_prefix = thumbnail_settings.THUMBNAIL_PREFIX
+        live, dead = set(), set()
+        stale_sources = 0
+        last_key = ''
+        while True:
+            rows = list(KVStore.objects.filter(
+                key__startswith=prefix, key__gt=last_key,
+            ).order_by('key').values_list('key', 'value')[:self.batch_size])
+            if not rows:
+                break
+            last_key = rows[-1][0]
+            stale = []
+            for key, value in rows:
+                name = json.loads(value)['name']
+                if name.startswith(thumbnail_prefix):
+                    live.add(compact_key(name))
+                elif compact_key(name) not in referenced:
+                    stale.append(del_prefix(key))
+            if stale:
+                stale_sources += len(stale)
+                dead.update(self.drop_sources(stale))
+        return live - dead, stale_sources
+
+    def drop_sources(self, source_keys):
+        """Удаляет записи картинок и их миниатюр, возвращает ключи
+        имен миниатюр."""
+        lists_keys = [add_prefix(key, 'thumbnails') for key in source_keys]
+        thumbnail_keys = [
+            add_prefix(key)
+            for value in KVStore.objects.filter(
+                key__in=lists_keys).values_list('value', flat=True)
+            for key in json.loads(value)
+        ]
+        names = [
+            json.loads(value)['name']
+            for value in KVStore.objects.filter(
+                key__in=thumbnail_keys).values_list('value', flat=True)
+        ]
+        if not self.dry_run:
+            default.kvstore._delete_raw(
+                *[add_prefix(key) for key in source_keys],
+                *lists_keys, *thumbnail_keys)
+        return map(compact_key, names)
+
+    def sweep_files(self, executor, storage, directory, keep, deadline):
+        """Удаляет пачками в пуле потоков файлы каталога, которых нет
+        в keep. Возвращает число и общий объем таких файлов."""
+        count = size = 0
+        batch = []
+        for name, modified, file_size in iter_storage_files(
+                storage, directory):
+            if modified > deadline or compact_key(name) in keep:
+                continue
+            count += 1
+            size += file_size
+            if self.verbosity > 1:
+                self.stdout.write(name)
+            if self.dry_run:
+                continue
+            batch.append(name)
+            if len(batch) >= self.batch_size:
+                list(executor.map(storage.delete, batch))
+                batch = []
+        list(executor.map(storage.delete, batch))
+        return count, size
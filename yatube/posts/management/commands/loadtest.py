@@ -0,0 +1,125 @@
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import loadtest
+
+
+class Command(BaseCommand):
+    help = ('Наполняет базу синтетическими данными и прогоняет смешанную '
+            'нагрузку по основным страницам, печатая сводку по маршрутам.')
+
+    def add_arguments(self, parser):
+        seeding = parser.add_argument_group('наполнение базы')
+        seeding.add_argument('--users', type=int, default=0)
+        seeding.add_argument('--groups', type=int, default=0)
+        seeding.add_argument('--posts', type=int, default=0)
+        seeding.add_argument('--follows', type=int, default=0)
+        seeding.add_argument('--comments', type=int, default=0)
+        seeding.add_argument(
+            '--alpha', type=float, default=1.2,
+            help='Показатель степенного закона для подписок и авторства.',
+        )
+        seeding.add_argument('--prefix', default='load')
+        workload = parser.add_argument_group('нагрузка')
+        workload.add_argument(
+            '--requests', type=int, default=0,
+            help='Общее число запросов. 0 - только наполнить базу.',
+        )
+        workload.add_argument('--concurrency', type=int, default=4)
+        workload.add_argument(
+            '--pool', choices=('thread', 'process'), default='thread',
+        )
+        workload.add_argument(
+            '--url',
+            help='Адрес запущенного сервера. Без него запросы идут '
+                 'в WSGI-приложение внутри процесса.',
+        )
+        workload.add_argument('--random-seed', type=int, default=None)
+        workload.add_argument('--output', help='Файл для JSON-отчета.')
+        workload.add_argument(
+            '--compare', help='JSON-отчет прошлого прогона для сравнения.',
+        )
+
+    def handle(self, *args, **options):
+        counts = {name: options[name] for name in (
+            'users', 'groups', 'posts', 'follows', 'comments')}
+        if any(counts.values()):
+            started = time.perf_counter()
+            loadtest.seed(alpha=options['alpha'], prefix=options['prefix'],
+                          **counts)
+            self.stdout.write(
+                f'База наполнена за {time.perf_counter() - started:.1f} с')
+        if not options['requests']:
+            return
+        targets = loadtest.sample_targets(options['prefix'])
+        if not all(targets.values()):
+            raise CommandError(
+                'Нет пользователей, групп или постов для нагрузки: '
+                'запустите команду с --users, --groups и --posts.')
+        report = self.run_workload(targets, options)
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        if options['compare']:
+            with open(options['compare']) as file:
+                baseline = json.load(file)
+            self.print_comparison(
+                loadtest.compare_reports(baseline, report))
+
+    def run_workload(self, targets, options):
+        concurrency = options['concurrency']
+        per_worker, extra = divmod(options['requests'], concurrency)
+        if options['pool'] == 'process':
+            executor = ProcessPoolExecutor(
+                concurrency,
+                initializer=loadtest.drop_inherited_connections)
+        else:
+            executor = ThreadPoolExecutor(concurrency)
+        seed_value = options['random_seed']
+        started = time.perf_counter()
+        with executor:
+            futures = [
+                executor.submit(
+                    loadtest.run_worker, targets,
+                    per_worker + (1 if worker < extra else 0),
+                    options['url'],
+                    None if seed_value is None else seed_value + worker,
+                )
+                for worker in range(concurrency)
+            ]
+            samples = [
+                sample for future in futures for sample in future.result()]
+        elapsed = time.perf_counter() - started
+        config = {
+            name: options[name]
+            for name in ('requests', 'concurrency', 'pool', 'url')
+        }
+        return loadtest.build_report(samples, elapsed, config)
+
+    def print_report(self, report):
+        self.stdout.write(
+            f'{report["requests"]} запросов за {report["elapsed_s"]} с, '
+            f'{report["throughput_rps"]} запр/с')
+        self.stdout.write(
+            f'{"маршрут":<14}{"запр":>7}{"ошибки":>8}{"запр/с":>9}'
+            f'{"p50 мс":>9}{"p99 мс":>9}{"SQL":>7}')
+        for route, stats in report['routes'].items():
+            queries = stats['db_queries']
+            self.stdout.write(
+                f'{route:<14}{stats["requests"]:>7}{stats["errors"]:>8}'
+                f'{stats["throughput_rps"]:>9}'
+                f'{stats["latency_ms"]["p50"]:>9}'
+                f'{stats["latency_ms"]["p99"]:>9}'
+                f'{queries["mean"] if queries else "-":>7}')
+
+    def print_comparison(self, comparison):
+        self.stdout.write('Сравнение с прошлым прогоном (было -> стало):')
+        for route, metrics in comparison.items():
+            changes = ', '.join(
+                f'{name} {old} -> {new}'
+                for name, (old, new) in metrics.items())
+            self.stdout.write(f'{route}: {changes}')
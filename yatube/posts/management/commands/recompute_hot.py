@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.models import Comment, Post
+from posts.ranking import compute_hot
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает рейтинг постов, у которых были комментарии '
+            'за последние часы. Затухание учитывается самой формулой '
+            'рейтинга, поэтому остальные посты не переписываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=float, default=24,
+            help='За сколько часов учитывать новые комментарии.',
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options['hours'])
+        post_ids = Comment.objects.changed_since(since).order_by(
+        ).values_list('post_id', flat=True).distinct()
+        batch_size = options['batch_size']
+        updated = 0
+        batch = []
+        for post in Post.objects.filter(pk__in=post_ids).only(
+                'pk', 'pub_date').iterator():
+            comment_dates = post.comments.values_list('pub_date', flat=True)
+            post.hot = compute_hot(post.pub_date, comment_dates)
+            batch.append(post)
+            if len(batch) >= batch_size:
+                updated += self.save(batch)
+                batch = []
+        updated += self.save(batch)
+        self.stdout.write(f'Пересчитан рейтинг {updated} постов')
+
+    @staticmethod
+    def save(batch):
+        Post.objects.bulk_update(batch, ['hot'])
+        return len(batch)
@@ -0,0 +1,104 @@
+import hashlib
+import os
+import posixpath
+import threading
+import time
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import connection, transaction
+from sorl.thumbnail import delete as delete_thumbnail_source
+
+from .models import ArchivedPost, Post
+
+# Только что переиспользованный файл может еще не иметь сохраненного поста,
+# поэтому свежие файлы не удаляются сразу, их потом удалит gc_media.
+RELEASE_GRACE = 60 * 10
+
+
+def image_field_file(name):
+    field = Post._meta.get_field('image')
+    return field.attr_class(None, field, name)
+
+
+def compact_key(name):
+    """8 байт вместо полного пути, чтобы множество ссылок на миллионы
+    файлов помещалось в память. Совпадение хешей лишь оставит
+    лишний файл."""
+    return hashlib.blake2b(name.encode(), digest_size=8).digest()
+
+
+def iter_storage_files(storage, directory):
+    """Обходит каталог хранилища, не собирая список файлов целиком:
+    (имя, время изменения, размер) каждого файла."""
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(storage.path(current))
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                name = posixpath.join(current, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(name)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    yield name, stat.st_mtime, stat.st_size
+
+
+def unreferenced(names):
+    """Имена файлов, на которые не ссылается ни один пост."""
+    names = set(filter(None, names))
+    if not names:
+        return set()
+    referenced = set()
+    for model in (Post, ArchivedPost):
+        referenced.update(model.objects.filter(
+            image__in=names).values_list('image', flat=True))
+    return names - referenced
+
+
+def delete_image(name):
+    """Удаляет файл картинки, ее миниатюры и их записи в хранилище
+    sorl-thumbnail."""
+    delete_thumbnail_source(image_field_file(name))
+
+
+def release_images(names):
+    """Удаляет после коммита файлы, на которые больше нет ссылок."""
+    names = set(filter(None, names))
+    if names:
+        transaction.on_commit(lambda: _delete_released(names))
+
+
+def release_images_in_background(names, batch_size=1000):
+    """Как release_images, но для большого числа файлов: после коммита
+    они проверяются и удаляются пачками в отдельном потоке."""
+    names = sorted(set(filter(None, names)))
+    if not names:
+        return
+
+    def run():
+        try:
+            for start in range(0, len(names), batch_size):
+                _delete_released(names[start:start + batch_size])
+        finally:
+            connection.close()
+
+    transaction.on_commit(lambda: threading.Thread(
+        target=run, daemon=True).start())
+
+
+def _delete_released(names):
+    storage = Post._meta.get_field('image').storage
+    deadline = time.time() - RELEASE_GRACE
+    for name in unreferenced(names):
+        try:
+            modified = storage.get_modified_time(name).timestamp()
+        except SuspiciousFileOperation:
+            continue
+        except OSError:
+            modified = 0
+        if modified <= deadline:
+            delete_image(name)
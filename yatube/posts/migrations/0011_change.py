@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False, verbose_name='Номер изменения')),
+                ('op', models.CharField(choices=[('create', 'Создание'), ('update', 'Изменение'), ('delete', 'Удаление')], max_length=6, verbose_name='Операция')),
+                ('model', models.CharField(max_length=50, verbose_name='Модель')),
+                ('object_pk', models.PositiveIntegerField(verbose_name='ID объекта')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Время изменения')),
+            ],
+            options={
+                'ordering': ('seq',),
+            },
+        ),
+    ]
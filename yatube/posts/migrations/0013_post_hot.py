@@ -0,0 +1,41 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:43
+
+from django.db import migrations, models
+import posts.ranking
+
+BATCH_SIZE = 500
+
+
+def backfill_hot(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    batch = []
+    for post in Post.objects.only('pk', 'pub_date').iterator():
+        comment_dates = Comment.objects.filter(
+            post_id=post.pk).values_list('pub_date', flat=True)
+        post.hot = posts.ranking.compute_hot(post.pub_date, comment_dates)
+        batch.append(post)
+        if len(batch) >= BATCH_SIZE:
+            Post.objects.bulk_update(batch, ['hot'])
+            batch = []
+    Post.objects.bulk_update(batch, ['hot'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_pub_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hot',
+            field=models.FloatField(db_index=True, default=posts.ranking.initial_hot, editable=False, verbose_name='Рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-hot'], name='post_group_hot_idx'),
+        ),
+        migrations.RunPython(backfill_hot, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    Post = apps.get_model('posts', 'Post')
+    stats = []
+    for group_id in Group.objects.values_list('pk', flat=True).iterator():
+        posts = Post.objects.filter(group_id=group_id)
+        last = posts.order_by('-pub_date', '-pk').values_list(
+            'pk', 'pub_date').first() or (None, None)
+        stats.append(GroupStats(
+            group_id=group_id, posts_count=posts.count(),
+            last_post_id=last[0], last_post_at=last[1]))
+    GroupStats.objects.bulk_create(stats, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group', verbose_name='Группа')),
+                ('posts_count', models.PositiveIntegerField(db_index=True, default=0, verbose_name='Число постов')),
+                ('last_post_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата последнего поста')),
+                ('last_post_id', models.IntegerField(blank=True, null=True, verbose_name='Последний пост')),
+            ],
+        ),
+        migrations.RunPython(backfill_group_stats, migrations.RunPython.noop),
+    ]
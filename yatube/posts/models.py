@@ -1,13 +1,16 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 
-from core.models import CreatedModel
+from core.models import AtomicSaveModel, CreatedModel
+
+from .ranking import initial_hot
+from .storage import ContentAddressedStorage
 
 
 User = get_user_model()
 
 
-class Group(models.Model):
+class Group(AtomicSaveModel):
     title = models.CharField(max_length=200, verbose_name='Имя группы')
     slug = models.SlugField(
         unique=True,
@@ -43,9 +46,51 @@ class Post(CreatedModel):
     image = models.ImageField(
         verbose_name='Картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True,
         help_text='Загрузите картинку'
     )
+    image_width = models.PositiveIntegerField(
+        verbose_name='Ширина картинки',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    image_height = models.PositiveIntegerField(
+        verbose_name='Высота картинки',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    image_size = models.PositiveIntegerField(
+        verbose_name='Размер картинки в байтах',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    image_format = models.CharField(
+        verbose_name='Формат картинки',
+        max_length=10,
+        blank=True,
+        editable=False,
+    )
+    image_placeholder = models.TextField(
+        verbose_name='Превью картинки',
+        help_text='Размытая копия картинки в виде data URI',
+        blank=True,
+        editable=False,
+    )
+    hot = models.FloatField(
+        verbose_name='Рейтинг',
+        default=initial_hot,
+        db_index=True,
+        editable=False,
+    )
+
+    class Meta(CreatedModel.Meta):
+        indexes = (
+            models.Index(fields=('group', '-hot'), name='post_group_hot_idx'),
+        )
 
     def __str__(self):
         MAX_LENGTH = 15
@@ -77,7 +122,7 @@ class Comment(CreatedModel):
         return self.text[:MAX_LENGTH]
 
 
-class Follow(models.Model):
+class Follow(AtomicSaveModel):
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -90,3 +135,142 @@ class Follow(models.Model):
         related_name='following',
         verbose_name='Автор'
     )
+
+
+class Change(models.Model):
+    """Запись журнала изменений для выгрузки данных по дельтам."""
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    OPERATIONS = (
+        (CREATE, 'Создание'),
+        (UPDATE, 'Изменение'),
+        (DELETE, 'Удаление'),
+    )
+
+    seq = models.BigAutoField(
+        primary_key=True,
+        verbose_name='Номер изменения'
+    )
+    op = models.CharField(
+        max_length=6,
+        choices=OPERATIONS,
+        verbose_name='Операция'
+    )
+    model = models.CharField(max_length=50, verbose_name='Модель')
+    object_pk = models.PositiveIntegerField(verbose_name='ID объекта')
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Время изменения'
+    )
+
+    class Meta:
+        ordering = ('seq',)
+
+    def __str__(self):
+        return f'{self.seq} {self.op} {self.model}:{self.object_pk}'
+
+
+class ArchivedPost(models.Model):
+    """Старый пост, перенесенный из Post командой archive_posts.
+
+    Сохраняет id, даты и данные картинки исходного поста. Архив только
+    читается: посты открываются по старым ссылкам и видны в профиле
+    автора, но не попадают в ленты.
+    """
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст поста')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Автор поста'
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        verbose_name='Группа'
+    )
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        storage=ContentAddressedStorage(),
+        blank=True,
+    )
+    image_width = models.PositiveIntegerField(
+        verbose_name='Ширина картинки', null=True, blank=True)
+    image_height = models.PositiveIntegerField(
+        verbose_name='Высота картинки', null=True, blank=True)
+    image_size = models.PositiveIntegerField(
+        verbose_name='Размер картинки в байтах', null=True, blank=True)
+    image_format = models.CharField(
+        verbose_name='Формат картинки', max_length=10, blank=True)
+    image_placeholder = models.TextField(
+        verbose_name='Превью картинки', blank=True)
+    pub_date = models.DateTimeField('Дата создания', db_index=True)
+    updated_at = models.DateTimeField('Дата изменения')
+    archived_at = models.DateTimeField(
+        'Дата переноса в архив', auto_now_add=True)
+
+    class Meta:
+        ordering = ('-pub_date',)
+
+    def __str__(self):
+        MAX_LENGTH = 15
+        return self.text[:MAX_LENGTH]
+
+
+class ArchivedComment(models.Model):
+    """Комментарий к посту из архива."""
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+        verbose_name='Комментарий'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+        verbose_name='Автор поста'
+    )
+    text = models.TextField(verbose_name='Текст комментария')
+    pub_date = models.DateTimeField('Дата создания', db_index=True)
+    updated_at = models.DateTimeField('Дата изменения')
+
+    class Meta:
+        ordering = ('-pub_date',)
+
+    def __str__(self):
+        MAX_LENGTH = 15
+        return self.text[:MAX_LENGTH]
+
+
+class GroupStats(models.Model):
+    """Число постов группы и ее последний пост.
+
+    Обновляется сигналами при сохранении и удалении постов, чтобы
+    каталог групп не считал их запросом на каждую группу.
+    """
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Группа'
+    )
+    posts_count = models.PositiveIntegerField(
+        'Число постов', default=0, db_index=True)
+    last_post_at = models.DateTimeField(
+        'Дата последнего поста', null=True, blank=True)
+    # Без внешнего ключа: посты удаляются и уходят в архив пачками,
+    # а статистика пересчитывается после.
+    last_post_id = models.IntegerField(
+        'Последний пост', null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.group_id}: {self.posts_count}'
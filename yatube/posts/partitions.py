@@ -0,0 +1,169 @@
+"""Чтение лент по месячным окнам.
+
+Посты логически разбиты на месяцы по pub_date. Пагинатор знает, сколько
+постов в каждом месяце, и для страницы читает только те окна, в которые
+она попадает, от новых к старым, останавливаясь, когда страница набрана.
+Так время ответа зависит от размера страницы, а не от всей истории.
+С общим кэшем число постов в закрытых месяцах кэшируется; сохранение
+или удаление поста меняет версию его месяца, а подписка или отписка -
+версию ленты подписок пользователя. Без общего кэша смена версии дошла
+бы только до одного процесса, а по устаревшим числам страницы
+пропускали бы или повторяли посты, поэтому числа не кэшируются.
+Числа месяцев, которых нет в кэше, считаются одним запросом
+с группировкой по месяцу.
+"""
+from datetime import timedelta
+from hashlib import md5
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from core.cache import shared_cache
+
+PARTITION_COUNT_TIMEOUT = 60 * 60
+
+
+def month_start(moment):
+    return moment.astimezone(timezone.utc).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(start):
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def previous_month(start):
+    return (start - timedelta(days=1)).replace(day=1)
+
+
+def iter_months(newest, oldest):
+    """Начала месяцев от newest до oldest включительно."""
+    start, last = month_start(newest), month_start(oldest)
+    while start >= last:
+        yield start
+        start = previous_month(start)
+
+
+def version_key(start):
+    return f'partition_version:{start:%Y-%m}'
+
+
+def follow_version_key(user_id):
+    return f'follow_version:{user_id}'
+
+
+def _touch(keys):
+    """Меняет версии сразу и еще раз после коммита, чтобы число,
+    посчитанное до коммита по старым строкам, тоже устарело."""
+    def touch():
+        stamp = timezone.now().timestamp()
+        cache.set_many({key: stamp for key in keys}, None)
+
+    touch()
+    transaction.on_commit(touch)
+
+
+def touch_partitions(moments):
+    """Сбрасывает кэшированные числа постов месяцев, к которым
+    относятся моменты moments."""
+    _touch({version_key(month_start(moment)) for moment in moments})
+
+
+def touch_follows(user_ids):
+    """Сбрасывает кэшированные числа постов лент подписок
+    пользователей user_ids."""
+    _touch({follow_version_key(user_id) for user_id in user_ids})
+
+
+class PartitionedPosts:
+    """Лента, упорядоченная по -pub_date, как последовательность
+    для пагинатора: срез читает только нужные месячные окна."""
+
+    def __init__(self, queryset, version_keys=()):
+        """version_keys - ключи версий, от которых, кроме месяца,
+        зависят числа постов этой ленты."""
+        self.queryset = queryset
+        self.version_keys = list(version_keys)
+
+    @cached_property
+    def partitions(self):
+        """[(начало, конец, число постов)] от новых месяцев к старым."""
+        bounds = self.queryset.aggregate(
+            oldest=Min('pub_date'), newest=Max('pub_date'))
+        if bounds['oldest'] is None:
+            return []
+        months = list(iter_months(bounds['newest'], bounds['oldest']))
+        keys = self.count_keys(months) if shared_cache() else {}
+        cached = cache.get_many(list(keys.values())) if keys else {}
+        counts = {
+            start: cached[keys[start]]
+            for start in months if keys.get(start) in cached
+        }
+        missing = [start for start in months if start not in counts]
+        if missing:
+            counted = self.month_counts(missing[-1], next_month(missing[0]))
+            for start in missing:
+                counts[start] = counted.get(start, 0)
+        fresh = {
+            keys[start]: counts[start] for start in missing if start in keys}
+        if fresh:
+            cache.set_many(fresh, PARTITION_COUNT_TIMEOUT)
+        return [
+            (start, next_month(start), counts[start]) for start in months]
+
+    def count_keys(self, months):
+        """{начало месяца: ключ кэша его числа постов} закрытых месяцев."""
+        current = month_start(timezone.now())
+        query = md5(str(self.queryset.query).encode()).hexdigest()
+        versions = cache.get_many(
+            [version_key(start) for start in months] + self.version_keys)
+        feed_version = ':'.join(
+            str(versions.get(key, 0)) for key in self.version_keys)
+        return {
+            start: (f'partition_count:{query}:{feed_version}:{start:%Y-%m}:'
+                    f'{versions.get(version_key(start), 0)}')
+            for start in months if start < current
+        }
+
+    def month_counts(self, start, end):
+        """{начало месяца: число постов} за [start, end) одним запросом."""
+        rows = self.window(start, end).order_by().annotate(
+            month=TruncMonth('pub_date', tzinfo=timezone.utc)
+        ).values('month').annotate(count=Count('pk')).values_list(
+            'month', 'count')
+        return {month_start(month): count for month, count in rows}
+
+    def window(self, start, end):
+        return self.queryset.published_between(start, end)
+
+    def count(self):
+        return sum(count for _, _, count in self.partitions)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        bottom, top = item.start or 0, item.stop
+        objects = []
+        offset = 0
+        for start, end, count in self.partitions:
+            if offset >= top:
+                break
+            if offset + count > bottom:
+                objects.extend(self.window(start, end)[
+                    max(bottom - offset, 0):min(top - offset, count)])
+            offset += count
+        return objects
+
+
+class PartitionedPaginator(Paginator):
+    def __init__(self, object_list, *args, version_keys=(), **kwargs):
+        super().__init__(
+            PartitionedPosts(object_list, version_keys), *args, **kwargs)
@@ -0,0 +1,38 @@
+"""Рейтинг «горячих» постов с затуханием по времени.
+
+Каждое событие (публикация поста, комментарий) весит 2^(t / HALF_LIFE),
+где t - время события от HOT_EPOCH. Рейтинг поста - log2 суммы весов его
+событий. Такой рейтинг упорядочивает посты так же, как сумма весов,
+затухающих вдвое каждые HALF_LIFE секунд, но хранимые значения со
+временем не меняются: затухание не требует переписывать таблицу.
+"""
+import math
+from datetime import datetime
+
+from django.utils import timezone
+
+HOT_EPOCH = datetime(2022, 1, 1, tzinfo=timezone.utc)
+HALF_LIFE = 12 * 60 * 60
+
+
+def hot_points(moment):
+    """log2 веса события, случившегося в moment."""
+    return (moment - HOT_EPOCH).total_seconds() / HALF_LIFE
+
+
+def add_points(score, points):
+    """log2(2^score + 2^points) без переполнения."""
+    high, low = max(score, points), min(score, points)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def initial_hot():
+    """Рейтинг только что опубликованного поста."""
+    return hot_points(timezone.now())
+
+
+def compute_hot(pub_date, comment_dates):
+    score = hot_points(pub_date)
+    for moment in comment_dates:
+        score = add_points(score, hot_points(moment))
+    return score
@@ -0,0 +1,190 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.metrics import OBJECTS_CREATED
+
+from .changes import record_changes
+from .feeds import touch_feeds
+from .fragments import author_stamp, invalidate_post_fragments
+from .groups import (
+    add_group_post, drop_group_directory, remove_group_post,
+    touch_group_index)
+from .images import EMPTY_METADATA, read_image_metadata
+from .media import release_images
+from .models import Change, Comment, Follow, Group, Post, User
+from .partitions import touch_follows, touch_partitions
+from .ranking import add_points, hot_points
+
+AUTHOR_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(pre_save, sender=User)
+def remember_author_stamp(sender, instance, raw, update_fields, **kwargs):
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not AUTHOR_FIELDS & set(update_fields):
+        return
+    old = User.objects.filter(pk=instance.pk).only(*AUTHOR_FIELDS).first()
+    if old is not None:
+        instance._old_author_stamp = author_stamp(old)
+
+
+@receiver(post_save, sender=User)
+def drop_author_fragments(sender, instance, **kwargs):
+    """Имя автора входит в ключ карточки, так что после его смены
+    карточки со старым именем не используются. Здесь они удаляются
+    из кэша, в том числе карточки архивных постов."""
+    old_stamp = instance.__dict__.pop('_old_author_stamp', None)
+    if old_stamp is None or old_stamp == author_stamp(instance):
+        return
+    for posts in (instance.posts, instance.archived_posts):
+        invalidate_post_fragments(
+            posts.values_list('pk', 'updated_at').iterator(), old_stamp
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Follow)
+@receiver(post_save, sender=Group)
+def log_save(sender, instance, created, raw, **kwargs):
+    """Изменение пишется в журнал в той же транзакции, что и объект."""
+    if raw:
+        return
+    op = Change.CREATE if created else Change.UPDATE
+    record_changes(op, sender, [instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Follow)
+@receiver(post_delete, sender=Group)
+def log_delete(sender, instance, **kwargs):
+    record_changes(Change.DELETE, sender, [instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+def bump_post_hot(sender, instance, created, raw, **kwargs):
+    """Новый комментарий поднимает рейтинг поста.
+
+    update() не меняет updated_at, поэтому кэши поста не сбрасываются.
+    """
+    if not created or raw:
+        return
+    posts = Post.objects.filter(pk=instance.post_id)
+    score = posts.values_list('hot', flat=True).first()
+    if score is not None:
+        posts.update(hot=add_points(score, hot_points(instance.pub_date)))
+
+
+@receiver(pre_save, sender=Post)
+def fill_image_metadata(sender, instance, raw, **kwargs):
+    """Данные о картинке считываются один раз, при загрузке файла,
+    чтобы при показе поста не открывать его."""
+    if raw:
+        return
+    image = instance.image
+    if not image:
+        metadata = EMPTY_METADATA
+    elif not image._committed:
+        try:
+            metadata = read_image_metadata(image.file)
+        except (OSError, ValueError):
+            metadata = EMPTY_METADATA
+    else:
+        return
+    for field, value in metadata.items():
+        setattr(instance, field, value)
+
+
+@receiver(pre_save, sender=Post)
+def remember_replaced_image(sender, instance, raw, **kwargs):
+    """Запоминает старую картинку, если пост получает новую или
+    картинку убрали."""
+    if raw or instance._state.adding:
+        return
+    if instance.image and instance.image._committed:
+        return
+    instance._replaced_image = Post.objects.filter(
+        pk=instance.pk).values_list('image', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def release_replaced_image(sender, instance, **kwargs):
+    name = instance.__dict__.pop('_replaced_image', None)
+    if name and name != instance.image.name:
+        release_images([name])
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(sender, instance, **kwargs):
+    release_images([instance.image.name])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def touch_post_partition(sender, instance, raw=False, **kwargs):
+    """Число постов месяца публикации в кэше больше не верно."""
+    if not raw:
+        touch_partitions([instance.pub_date])
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def touch_follow_feed(sender, instance, raw=False, **kwargs):
+    """Число постов в ленте подписок подписчика больше не верно."""
+    if not raw:
+        touch_follows([instance.user_id])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def touch_post_feeds(sender, raw=False, **kwargs):
+    if not raw:
+        touch_feeds()
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_group(sender, instance, raw, **kwargs):
+    if raw or instance._state.adding:
+        return
+    instance._old_group_id = Post.objects.filter(
+        pk=instance.pk).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def count_group_post(sender, instance, created, raw, **kwargs):
+    """Новый пост или перенос поста в другую группу меняет
+    статистику групп."""
+    if raw:
+        return
+    old_group_id = instance.__dict__.pop('_old_group_id', None)
+    if not created and old_group_id == instance.group_id:
+        return
+    if old_group_id is not None:
+        remove_group_post(old_group_id, instance.pk)
+    if instance.group_id is not None:
+        add_group_post(instance.group_id, instance.pk, instance.pub_date)
+
+
+@receiver(post_delete, sender=Post)
+def uncount_group_post(sender, instance, **kwargs):
+    if instance.group_id is not None:
+        remove_group_post(instance.group_id, instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def drop_directory_on_group_change(sender, **kwargs):
+    drop_group_directory()
+    touch_group_index()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Follow)
+def count_created(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        model = sender._meta.model_name
+        transaction.on_commit(lambda: OBJECTS_CREATED.inc(model=model))
@@ -0,0 +1,58 @@
+import hashlib
+import os
+import posixpath
+from tempfile import mkstemp
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, в котором имя файла - хеш его содержимого.
+
+    Файл хешируется во время записи во временный файл и затем получает
+    имя posts/ab/abcd...ext. Если такой файл уже есть, повторная копия
+    не создается: пост ссылается на существующий файл, и миниатюры,
+    построенные sorl-thumbnail для этого имени, тоже переиспользуются.
+    Файл удаляется, когда на него не ссылается ни один пост
+    (см. posts.media).
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        directory = self.path(posixpath.dirname(name))
+        os.makedirs(directory, exist_ok=True)
+        descriptor, tmp_path = mkstemp(dir=directory, suffix='.upload')
+        digest = hashlib.sha256()
+        try:
+            with os.fdopen(descriptor, 'wb') as tmp_file:
+                content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp_file.write(chunk)
+            name = content_name(name, digest.hexdigest())
+            full_path = self.path(name)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            try:
+                os.link(tmp_path, full_path)
+            except FileExistsError:
+                # Дубликат: файл уже лежит на месте. Время изменения
+                # обновляется, чтобы сборщик не удалил его, пока пост
+                # с новой ссылкой еще не сохранен.
+                os.utime(full_path)
+            else:
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        finally:
+            os.remove(tmp_path)
+        return name
+
+
+def content_name(name, digest):
+    """posts/photo.JPG -> posts/ab/ab...cd.jpg."""
+    extension = posixpath.splitext(name)[1].lower()
+    return posixpath.join(
+        posixpath.dirname(name), digest[:2], digest + extension)
@@ -0,0 +1,11 @@
+from django import template
+
+from posts.fragments import get_post_fragment
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_fragment(post):
+    return get_post_fragment(post)
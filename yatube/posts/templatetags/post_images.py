@@ -0,0 +1,16 @@
+from django import template
+
+from posts.images import thumbnail_size
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_thumbnail_size(post, geometry, crop=False, upscale=None):
+    """{'width': ..., 'height': ...} миниатюры картинки поста по размерам,
+    сохраненным при загрузке, или None."""
+    size = thumbnail_size(
+        post.image_width, post.image_height, geometry, crop, upscale)
+    if size is None:
+        return None
+    return {'width': size[0], 'height': size[1]}
@@ -0,0 +1,71 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from posts.accounts import _delete_in_batches, delete_account
+from posts.models import Change, Comment, Follow, Post, User
+from posts.ranking import compute_hot
+
+
+class DeleteAccountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='leaving')
+        cls.other = User.objects.create_user(username='staying')
+        cls.own_posts = Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {i}') for i in range(5))
+        cls.other_post = Post.objects.create(
+            author=cls.other, text='Чужой пост')
+        Comment.objects.bulk_create(
+            Comment(post=post, author=cls.other, text='Ответ')
+            for post in Post.objects.filter(author=cls.user))
+        for _ in range(3):
+            Comment.objects.create(
+                post=cls.other_post, author=cls.user, text='Комментарий')
+        cls.kept_comment = Comment.objects.create(
+            post=cls.other_post, author=cls.other, text='Остается')
+        Follow.objects.create(user=cls.user, author=cls.other)
+        Follow.objects.create(user=cls.other, author=cls.user)
+
+    def test_delete_account(self):
+        """Удаляется все, что связано с пользователем, удаление попадает
+        в журнал, рейтинг чужого поста пересчитывается."""
+        stats = delete_account(self.user, batch_size=2)
+        self.assertEqual(stats, {
+            'comments': 8, 'follows': 2, 'posts': 5,
+            'archived_comments': 0, 'archived_posts': 0,
+        })
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(
+            list(Comment.objects.all()), [self.kept_comment])
+        self.assertFalse(Follow.objects.exists())
+        deleted = Change.objects.filter(op=Change.DELETE)
+        self.assertEqual(deleted.filter(model='post').count(), 5)
+        self.assertEqual(deleted.filter(model='comment').count(), 8)
+        self.other_post.refresh_from_db()
+        self.assertAlmostEqual(self.other_post.hot, compute_hot(
+            self.other_post.pub_date, [self.kept_comment.pub_date]))
+
+    def test_batches_continue_after_last_pk(self):
+        """Каждая следующая пачка читается после pk предыдущей."""
+        comments = Comment.objects.filter(author=self.user).order_by('pk')
+        pks = list(comments.values_list('pk', flat=True))
+        with CaptureQueriesContext(connection) as queries:
+            _delete_in_batches(comments, 1, log=False)
+        selects = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT')]
+        for last_pk, sql in zip([0] + pks, selects):
+            with self.subTest(last_pk=last_pk):
+                self.assertIn(f'"id" > {last_pk}', sql)
+        self.assertFalse(comments.exists())
+
+    def test_delete_account_command(self):
+        out = StringIO()
+        call_command('delete_account', self.user.username, stdout=out)
+        self.assertIn('Удалено постов: 5', out.getvalue())
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='pass')
+        cls.user = User.objects.create_user(username='author')
+        Group.objects.bulk_create(
+            Group(title=f'Группа {i}', slug=f'group-{i}', description='')
+            for i in range(5)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:posts_post_changelist')
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url)
+        return [query['sql'] for query in context.captured_queries]
+
+    def test_group_choices_loaded_once(self):
+        """Число запросов не растет вместе с числом строк на странице."""
+        Post.objects.create(author=self.user, text='Пост')
+        cache.clear()
+        queries_for_one_row = len(self.changelist_queries())
+        for i in range(5):
+            Post.objects.create(author=self.user, text=f'Пост {i}')
+        cache.clear()
+        self.assertEqual(
+            len(self.changelist_queries()), queries_for_one_row)
+
+    def test_count_is_cached(self):
+        """Повторная загрузка списка не выполняет COUNT."""
+        Post.objects.create(author=self.user, text='Пост')
+        self.changelist_queries()
+        count_queries = [
+            sql for sql in self.changelist_queries()
+            if 'COUNT(' in sql and 'posts_post' in sql
+        ]
+        self.assertEqual(count_queries, [])
@@ -0,0 +1,63 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.archive import archive_cutoff, archive_posts
+from posts.models import ArchivedPost, Comment, Post, User
+from posts.views import NUMBER_OF_POSTS_ON_PAGE
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='archivist')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Новый пост {i}')
+            for i in range(NUMBER_OF_POSTS_ON_PAGE))
+        cls.old_post = Post.objects.create(
+            author=cls.user, text='Старый пост')
+        Comment.objects.create(
+            post=cls.old_post, author=cls.user, text='Старый комментарий')
+        cls.old_date = timezone.now() - timedelta(days=400)
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=cls.old_date)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_archive_posts(self):
+        """Старый пост с комментариями переезжает в архив
+        с прежними id и датой."""
+        self.assertEqual(archive_posts(archive_cutoff(365), batch_size=1), 1)
+        self.assertFalse(Post.objects.filter(pk=self.old_post.pk).exists())
+        self.assertFalse(Comment.objects.exists())
+        archived = ArchivedPost.objects.get(pk=self.old_post.pk)
+        self.assertEqual(archived.text, 'Старый пост')
+        self.assertEqual(archived.pub_date, self.old_date)
+        self.assertEqual(
+            list(archived.comments.values_list('text', flat=True)),
+            ['Старый комментарий'])
+        self.assertEqual(Post.objects.count(), NUMBER_OF_POSTS_ON_PAGE)
+
+    def test_archived_post_pages(self):
+        """Страница поста и профиль показывают архивный пост."""
+        call_command('archive_posts', stdout=StringIO())
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.old_post.pk,)))
+        self.assertContains(response, 'Старый комментарий')
+        self.assertNotContains(
+            response, reverse('posts:add_comment', args=(self.old_post.pk,)))
+        response = self.client.get(
+            reverse('posts:profile', args=(self.user.username,)),
+            {'page': 2})
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, NUMBER_OF_POSTS_ON_PAGE + 1)
+        self.assertEqual([post.pk for post in page_obj], [self.old_post.pk])
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.old_post.pk + 100,)))
+        self.assertEqual(response.status_code, 404)
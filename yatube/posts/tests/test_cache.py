@@ -1,7 +1,13 @@
+from datetime import timedelta
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
 
+from posts.archive import archive_posts
 from posts.models import Post, Group, Comment
 
 User = get_user_model()
@@ -47,3 +53,71 @@ class CacheTests(TestCase):
         cache.clear()
         response_after_clearing_cache = self.authorized_author_client.get('/')
         self.assertNotEqual(responce_after, response_after_clearing_cache)
+
+
+class PostFragmentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user_author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой')
+        cls.authorized_author_client = Client()
+        cls.authorized_author_client.force_login(cls.user_author)
+        cls.post = Post.objects.create(
+            author=cls.user_author,
+            text='Тестовый пост',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_fragment_is_reused(self):
+        """Карточка поста берется из кэша, а не рендерится заново."""
+        url = reverse('posts:profile', kwargs={'username': 'author'})
+        self.guest_client.get(url)
+        Post.objects.filter(pk=self.post.pk).update(text='Новый текст')
+        response = self.guest_client.get(url)
+        self.assertContains(response, 'Тестовый пост')
+        self.assertNotContains(response, 'Новый текст')
+
+    def test_fragment_invalidated_on_post_edit(self):
+        """После post_edit карточка поста рендерится заново."""
+        url = reverse('posts:profile', kwargs={'username': 'author'})
+        self.guest_client.get(url)
+        self.authorized_author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Отредактированный пост'},
+        )
+        response = self.guest_client.get(url)
+        self.assertContains(response, 'Отредактированный пост')
+
+    def test_fragment_invalidated_on_author_rename(self):
+        """После смены имени автора карточки его постов обновляются."""
+        url = reverse('posts:profile', kwargs={'username': 'author'})
+        self.guest_client.get(url)
+        self.user_author.first_name = 'Алексей'
+        self.user_author.save()
+        response = self.guest_client.get(url)
+        self.assertContains(response, 'Алексей Толстой')
+
+    def test_rename_seen_without_invalidation(self):
+        """Имя автора входит в ключ карточки: процесс, до которого
+        удаление из кэша не дошло, тоже показывает новое имя."""
+        url = reverse('posts:profile', kwargs={'username': 'author'})
+        self.guest_client.get(url)
+        with mock.patch('posts.signals.invalidate_post_fragments'):
+            self.user_author.first_name = 'Алексей'
+            self.user_author.save()
+        self.assertContains(self.guest_client.get(url), 'Алексей Толстой')
+
+    def test_archived_fragment_invalidated_on_author_rename(self):
+        """Карточки архивных постов автора тоже обновляются."""
+        archive_posts(timezone.now() + timedelta(seconds=1))
+        url = reverse('posts:profile', kwargs={'username': 'author'})
+        self.assertContains(self.guest_client.get(url), 'Тестовый пост')
+        self.user_author.first_name = 'Алексей'
+        self.user_author.save()
+        response = self.guest_client.get(url)
+        self.assertContains(response, 'Тестовый пост')
+        self.assertContains(response, 'Алексей Толстой')
@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Change, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ChangeLogTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-group-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.start = Change.objects.values_list('seq', flat=True).last() or 0
+
+    def logged(self):
+        return list(Change.objects.filter(seq__gt=self.start).values_list(
+            'op', 'model', 'object_pk'))
+
+    def test_writes_are_logged(self):
+        """Создание, изменение и удаление попадают в журнал по порядку."""
+        post = Post.objects.create(author=self.user, text='Пост')
+        post.text = 'Новый текст'
+        post.save()
+        follower = User.objects.create_user(username='follower')
+        follow = Follow.objects.create(user=follower, author=self.user)
+        Follow.objects.filter(pk=follow.pk).delete()
+        self.assertEqual(self.logged(), [
+            (Change.CREATE, 'post', post.pk),
+            (Change.UPDATE, 'post', post.pk),
+            (Change.CREATE, 'follow', follow.pk),
+            (Change.DELETE, 'follow', follow.pk),
+        ])
+
+    def test_export_command_resumes_from_checkpoint(self):
+        """Команда выгружает только изменения после отметки."""
+        Post.objects.create(author=self.user, text='Пост 1')
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, 'checkpoint')
+            with open(checkpoint, 'w') as file:
+                file.write(str(self.start))
+            out = StringIO()
+            call_command('export_changes', checkpoint=checkpoint, stdout=out)
+            self.assertEqual(len(out.getvalue().splitlines()), 1)
+            post = Post.objects.create(author=self.user, text='Пост 2')
+            out = StringIO()
+            call_command('export_changes', checkpoint=checkpoint, stdout=out)
+            lines = out.getvalue().splitlines()
+            self.assertEqual(len(lines), 1)
+            self.assertEqual(json.loads(lines[0])['pk'], post.pk)
+
+    def test_changes_endpoint(self):
+        """JSON-журнал доступен только персоналу."""
+        post = Post.objects.create(author=self.user, text='Пост')
+        url = reverse('posts:changes') + f'?since={self.start}'
+        response = Client().get(url)
+        self.assertEqual(response.status_code, 302)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        client = Client()
+        client.force_login(staff)
+        data = client.get(url).json()
+        self.assertEqual(data['changes'][0]['pk'], post.pk)
+        self.assertEqual(data['next_since'], data['changes'][-1]['seq'])
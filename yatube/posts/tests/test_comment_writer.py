@@ -0,0 +1,115 @@
+import threading
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from posts.comment_writer import CommentWriter
+from posts.models import Comment, Post
+from posts.throttling import COMMENTS_PER_USER
+
+User = get_user_model()
+
+
+class CommentWriterTests(TransactionTestCase):
+    def test_concurrent_comments_are_saved(self):
+        """Комментарии из параллельных потоков сохраняются все,
+        и каждый виден сразу после возврата из save."""
+        user = User.objects.create_user(username='author')
+        post = Post.objects.create(author=user, text='Пост')
+        writer = CommentWriter(window=0.05)
+        visible = []
+
+        def add_comment(number):
+            comment = Comment(author=user, post=post, text=f'Коммент {number}')
+            writer.save(comment)
+            visible.append(Comment.objects.filter(pk=comment.pk).exists())
+            connection.close()
+
+        threads = [
+            threading.Thread(target=add_comment, args=(i,))
+            for i in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(post.comments.count(), 10)
+        self.assertEqual(visible, [True] * 10)
+
+    def test_failed_batch_does_not_block_writer(self):
+        """Ошибка не из базы в пачке не оставляет писателя без ведущего:
+        следующий комментарий сохраняется, а не ждет вечно."""
+        user = User.objects.create_user(username='author')
+        post = Post.objects.create(author=user, text='Пост')
+        writer = CommentWriter(wait_timeout=1)
+        broken = Comment(author=user, post=post, text='Сломанный')
+        with mock.patch.object(
+                broken, 'save', side_effect=RuntimeError('сигнал упал')):
+            with self.assertRaises(RuntimeError):
+                writer.save(broken)
+        self.assertFalse(writer._leader_active)
+        writer.save(Comment(author=user, post=post, text='Следующий'))
+        self.assertEqual(post.comments.count(), 1)
+
+    def test_leader_hands_off(self):
+        """Ведущий пишет одну пачку и передает очередь ждущему потоку:
+        каждую пачку пишет поток, чей комментарий в ней."""
+        user = User.objects.create_user(username='author')
+        post = Post.objects.create(author=user, text='Пост')
+        writer = CommentWriter(window=0.05, max_batch_size=1)
+        own_batches = []
+        local = threading.local()
+        write = writer._write
+
+        def record(batch):
+            own_batches.append(
+                any(pending.comment is local.comment for pending in batch))
+            write(batch)
+
+        def add_comment(number):
+            local.comment = Comment(
+                author=user, post=post, text=f'Коммент {number}')
+            writer.save(local.comment)
+            connection.close()
+
+        with mock.patch.object(writer, '_write', record):
+            threads = [
+                threading.Thread(target=add_comment, args=(i,))
+                for i in range(3)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(post.comments.count(), 3)
+        self.assertTrue(own_batches)
+        self.assertTrue(all(own_batches))
+
+
+class CommentRateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_comment_storm_is_limited(self):
+        """Сверх лимита комментарии не сохраняются, ответ - 429."""
+        url = reverse('posts:add_comment', kwargs={'post_id': self.post.pk})
+        for i in range(COMMENTS_PER_USER):
+            response = self.authorized_client.post(url, {'text': f'{i}'})
+            self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        response = self.authorized_client.post(url, {'text': 'лишний'})
+        self.assertEqual(
+            response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(self.post.comments.count(), COMMENTS_PER_USER)
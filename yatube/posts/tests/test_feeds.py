@@ -0,0 +1,115 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.feeds import FEED_ITEMS
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-group-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Тестовый пост №{i}', group=cls.group)
+            for i in range(FEED_ITEMS + 5)
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Последний пост', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_available(self):
+        """Ленты отдаются и содержат не больше FEED_ITEMS записей."""
+        urls = (
+            reverse('posts:index_feed'),
+            reverse('posts:index_atom'),
+            reverse('posts:group_feed', kwargs={'slug': self.group.slug}),
+            reverse('posts:group_atom', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile_feed', kwargs={'username': 'author'}),
+            reverse('posts:profile_atom', kwargs={'username': 'author'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertContains(response, 'Последний пост')
+                content = response.content.decode()
+                self.assertEqual(
+                    content.count('<item>') + content.count('<entry>'),
+                    FEED_ITEMS
+                )
+
+    def test_conditional_get(self):
+        """Неизменившаяся лента отдается ответом 304."""
+        url = reverse('posts:index_feed')
+        response = self.guest_client.get(url)
+        not_modified = {
+            'HTTP_IF_NONE_MATCH': response['ETag'],
+            'HTTP_IF_MODIFIED_SINCE': response['Last-Modified'],
+        }
+        for header, value in not_modified.items():
+            with self.subTest(header=header):
+                response = self.guest_client.get(url, **{header: value})
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_feed_changes_after_post_save(self):
+        """Сохранение поста меняет ETag и содержимое ленты."""
+        url = reverse('posts:group_feed', kwargs={'slug': self.group.slug})
+        etag = self.guest_client.get(url)['ETag']
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, 'Исправленный пост')
+
+    @override_settings(SHARED_CACHE=True)
+    def test_poll_without_post_queries(self):
+        """С общим кэшем опрос ленты не читает посты, а удаление
+        поста меняет ее версию."""
+        url = reverse('posts:index_feed')
+        etag = self.guest_client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        Post.objects.create(author=self.user, text='Временный пост').delete()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_poll_reads_only_feed_items(self):
+        """Без общего кэша версия ленты считается по FEED_ITEMS
+        последним постам, без подсчета всех."""
+        url = reverse('posts:index_feed')
+        etag = self.guest_client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('COUNT', queries[0]['sql'])
+        self.assertIn(f'LIMIT {FEED_ITEMS}', queries[0]['sql'])
+        Post.objects.filter(pk=self.post.pk).delete()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_profile_feed_unknown_user(self):
+        response = self.guest_client.get(
+            reverse('posts:profile_feed', kwargs={'username': 'nobody'}))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -1,20 +1,24 @@
-import shutil
-import tempfile
+import hashlib
 
-from django.test import Client, TestCase, override_settings
+from io import BytesIO, StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
 from django.urls import reverse
-from django.conf import settings
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+from sorl.thumbnail import get_thumbnail
+
+from posts import media
 
 from posts.forms import PostForm
+from posts.images import thumbnail_size
 from posts.models import Post, User, Group, Comment
+from posts.tests.utils import TempMediaRootMixin
 
 
-TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
-
-
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
-class TaskCreateFormTests(TestCase):
+class TaskCreateFormTests(TempMediaRootMixin, TestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
@@ -43,11 +47,6 @@ class TaskCreateFormTests(TestCase):
         )
         cls.form = PostForm()
 
-    @classmethod
-    def tearDownClass(cls):
-        super().tearDownClass()
-        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
-
     def setUp(self):
         pass
 
@@ -81,12 +80,13 @@ class TaskCreateFormTests(TestCase):
         self.assertRedirects(response, reverse(
             'posts:profile', kwargs={'username': self.user.username}))
         self.assertEqual(Post.objects.count(), posts_count + 1)
+        digest = hashlib.sha256(small_gif).hexdigest()
         self.assertTrue(
             Post.objects.filter(
                 text=self.post.text,
                 group=self.group.pk,
                 author=self.user,
-                image='posts/small.gif',
+                image=f'posts/{digest[:2]}/{digest}.gif',
             ).exclude(id__in=posts_before_posting).exists()
         )
 
@@ -115,3 +115,77 @@ class TaskCreateFormTests(TestCase):
         self.assertNotEqual(new_text, old_text)
         self.assertNotIn(self.post.pk, new_list_posts_group)
         self.assertIn(self.post.pk, list_posts_group_1)
+
+    def test_image_metadata_filled_on_upload(self):
+        """При загрузке картинки сохраняются ее размеры, формат, объем
+        и превью, а команда backfill заполняет их для старых постов."""
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+        uploaded = SimpleUploadedFile(
+            name='metadata.gif',
+            content=small_gif,
+            content_type='image/gif'
+        )
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': self.post.text, 'image': uploaded},
+        )
+        expected = {
+            'image_width': 2,
+            'image_height': 1,
+            'image_size': len(small_gif),
+            'image_format': 'GIF',
+        }
+        post = Post.objects.get(pk=self.post.pk)
+        for field, value in expected.items():
+            with self.subTest(field=field):
+                self.assertEqual(getattr(post, field), value)
+        self.assertTrue(
+            post.image_placeholder.startswith('data:image/jpeg;base64,'))
+        Post.objects.filter(pk=post.pk).update(
+            image_width=None, image_height=None, image_size=None,
+            image_format='', image_placeholder='')
+        call_command(
+            'backfill_image_metadata', workers=1, stdout=StringIO())
+        post.refresh_from_db()
+        for field, value in expected.items():
+            with self.subTest(field=field):
+                self.assertEqual(getattr(post, field), value)
+
+    def test_thumbnail_size_matches_sorl(self):
+        """Размер миниатюры по сохраненным размерам совпадает с тем,
+        что создает sorl-thumbnail, и попадает в разметку поста."""
+        cases = (
+            ((2, 1), '960x339', {'crop': 'center', 'upscale': True}),
+            ((1200, 800), '960x339', {'crop': 'center'}),
+            ((500, 100), '960x339', {'crop': 'center', 'upscale': False}),
+            ((500, 100), '960x339', {'crop': 'center'}),
+            ((1200, 800), '300x300', {}),
+            ((100, 50), '300x300', {'upscale': False}),
+        )
+        storage = Post._meta.get_field('image').storage
+        for (width, height), geometry, options in cases:
+            with self.subTest(size=(width, height), options=options):
+                buffer = BytesIO()
+                Image.new('RGB', (width, height), 'red').save(buffer, 'PNG')
+                image = media.image_field_file(storage.save(
+                    f'posts/{width}x{height}.png',
+                    ContentFile(buffer.getvalue())))
+                thumbnail = get_thumbnail(image, geometry, **options)
+                self.assertEqual(
+                    thumbnail_size(
+                        width, height, geometry, bool(options.get('crop')),
+                        options.get('upscale')),
+                    (thumbnail.width, thumbnail.height))
+        post = Post.objects.get(pk=self.post.pk)
+        post.image, post.image_width, post.image_height = image, 1200, 800
+        post.save()
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}))
+        self.assertContains(response, 'width="960" height="339"')
@@ -0,0 +1,177 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.accounts import delete_account
+from posts.forms import PostForm
+from posts.models import Group, GroupStats, Post, User
+
+
+class GroupStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='grouper')
+        cls.group = Group.objects.create(
+            title='Первая', slug='first', description='Описание')
+        cls.other = Group.objects.create(
+            title='Вторая', slug='second', description='Описание')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def stats(self, group):
+        return GroupStats.objects.filter(group=group).values_list(
+            'posts_count', 'last_post_id').first()
+
+    def test_counts_follow_posts(self):
+        first = Post.objects.create(
+            author=self.user, text='Первый', group=self.group)
+        second = Post.objects.create(
+            author=self.user, text='Второй', group=self.group)
+        self.assertEqual(self.stats(self.group), (2, second.pk))
+        second.delete()
+        self.assertEqual(self.stats(self.group), (1, first.pk))
+
+    def test_edit_moves_post(self):
+        """Смена группы в post_edit переносит пост в статистике."""
+        post = Post.objects.create(
+            author=self.user, text='Пост', group=self.group)
+        self.client.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            {'text': 'Пост', 'group': self.other.pk})
+        self.assertEqual(self.stats(self.group), (0, None))
+        self.assertEqual(self.stats(self.other), (1, post.pk))
+
+    def test_delete_account_refreshes(self):
+        author = User.objects.create_user(username='leaving')
+        Post.objects.create(author=author, text='Пост', group=self.group)
+        delete_account(author)
+        self.assertEqual(self.stats(self.group), (0, None))
+
+    def test_directory(self):
+        """Без общего кэша страница каталога читается из базы, и новая
+        группа видна сразу."""
+        post = Post.objects.create(
+            author=self.user, text='Пост', group=self.other)
+        with self.assertNumQueries(2):
+            # Число групп и строки страницы.
+            groups = Client().get(
+                reverse('posts:groups_api')).json()['groups']
+        self.assertEqual(
+            [(group['slug'], group['posts_count'], group['last_post_id'])
+             for group in groups],
+            [('second', 1, post.pk), ('first', 0, None)])
+        Group.objects.bulk_create([
+            Group(title='Третья', slug='third', description='')])
+        self.assertContains(Client().get(reverse('posts:groups')), 'Третья')
+
+    @override_settings(SHARED_CACHE=True)
+    def test_directory_pages_cached(self):
+        """С общим кэшем страница берется из кэша, пока статистика
+        не изменилась."""
+        Client().get(reverse('posts:groups'))
+        with self.assertNumQueries(0):
+            response = Client().get(reverse('posts:groups'))
+        self.assertContains(response, 'Постов: 0')
+        Post.objects.create(author=self.user, text='Пост', group=self.other)
+        self.assertContains(
+            Client().get(reverse('posts:groups')), 'Постов: 1')
+
+    @mock.patch('posts.views.NUMBER_OF_GROUPS_ON_PAGE', 1)
+    def test_api_paginated(self):
+        response = Client().get(reverse('posts:groups_api'), {'page': 2})
+        data = response.json()
+        self.assertEqual(
+            [group['slug'] for group in data['groups']], ['first'])
+        self.assertEqual(
+            (data['page'], data['num_pages'], data['count']), (2, 2, 2))
+
+
+class GroupChoicesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='picker')
+        Group.objects.bulk_create(
+            Group(title=title, slug=f'group-{i}', description='Описание')
+            for i, title in enumerate(('Кошки', 'кофе', 'Книги', 'Собаки')))
+        cls.dogs = Group.objects.get(title='Собаки')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_choices_from_index(self):
+        """Варианты берутся из индекса, а не запросом при каждом
+        показе формы."""
+        PostForm().as_p()
+        with self.assertNumQueries(0):
+            html = PostForm().as_p()
+        self.assertIn(f'<option value="{self.dogs.pk}">Собаки</option>',
+                      html)
+        self.assertNotIn('data-autocomplete', html)
+
+    @mock.patch('posts.forms.GROUP_SELECT_LIMIT', 1)
+    @mock.patch('posts.groups.GROUP_SELECT_LIMIT', 1)
+    def test_edit_keeps_group(self):
+        """При подсказках группа поста, не попавшая в первые варианты,
+        выбрана в форме редактирования и сохраняется."""
+        post = Post.objects.create(
+            author=self.user, text='Пост', group=self.dogs)
+        url = reverse('posts:post_edit', args=(post.pk,))
+        response = self.client.get(url)
+        self.assertContains(response, 'data-autocomplete')
+        self.assertContains(
+            response,
+            f'<option value="{self.dogs.pk}" selected>Собаки</option>',
+            html=True)
+        self.client.post(url, {'text': 'Исправленный пост',
+                               'group': self.dogs.pk})
+        post.refresh_from_db()
+        self.assertEqual(
+            (post.text, post.group), ('Исправленный пост', self.dogs))
+
+    def test_new_group_in_choices(self):
+        PostForm().as_p()
+        Group.objects.create(title='Птицы', slug='birds', description='')
+        self.assertIn('Птицы', PostForm().as_p())
+
+    def test_index_expires(self):
+        """Индекс процесса перестраивается по истечении TTL, даже если
+        о новой группе узнал только другой процесс."""
+        PostForm().as_p()
+        Group.objects.bulk_create([
+            Group(title='Рыбы', slug='fish', description='')])
+        self.assertNotIn('Рыбы', PostForm().as_p())
+        with mock.patch('posts.groups.GROUP_INDEX_TTL', -1):
+            self.assertIn('Рыбы', PostForm().as_p())
+
+    def test_validation(self):
+        form = PostForm({'text': 'Пост', 'group': self.dogs.pk})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['group'], self.dogs)
+        self.assertFalse(
+            PostForm({'text': 'Пост', 'group': 10 ** 6}).is_valid())
+
+    def test_large_group_list(self):
+        """При большом числе групп список урезан, выбранная группа
+        в нем остается, а подсказки подключены."""
+        with mock.patch('posts.groups.GROUP_SELECT_LIMIT', 2), \
+                mock.patch('posts.forms.GROUP_SELECT_LIMIT', 2):
+            html = PostForm(initial={'group': self.dogs.pk}).as_p()
+        self.assertIn('data-autocomplete', html)
+        self.assertIn('Собаки', html)
+        self.assertNotIn('Кошки', html)
+
+    def test_autocomplete(self):
+        url = reverse('posts:groups_autocomplete')
+        response = self.client.get(url, {'q': 'ко'})
+        self.assertEqual(
+            [group['title'] for group in response.json()['groups']],
+            ['кофе', 'Кошки'])
+        self.assertEqual(
+            self.client.get(url, {'q': 'я'}).json(), {'groups': []})
@@ -0,0 +1,33 @@
+import random
+
+from django.db.models import F
+from django.test import TestCase
+
+from posts import loadtest
+from posts.models import Follow, Group, Post, User
+
+
+class LoadTestTests(TestCase):
+    def test_seed_and_workload(self):
+        """Наполнение базы и прогон нагрузки дают отчет по маршрутам."""
+        loadtest.seed(users=10, groups=2, posts=30, follows=15, comments=10,
+                      rng=random.Random(1))
+        self.assertEqual(
+            User.objects.filter(username__startswith='load_user_').count(),
+            10)
+        self.assertEqual(Post.objects.count(), 30)
+        for group in Group.objects.select_related('stats'):
+            with self.subTest(group=group.slug):
+                self.assertEqual(
+                    group.stats.posts_count, group.posts.count())
+        self.assertFalse(
+            Follow.objects.filter(user=F('author')).exists())
+        targets = loadtest.sample_targets()
+        samples = loadtest.run_worker(targets, 30, seed_value=1)
+        report = loadtest.build_report(samples, 1.0, {})
+        self.assertEqual(report['requests'], 30)
+        for route, stats in report['routes'].items():
+            with self.subTest(route=route):
+                self.assertEqual(stats['errors'], 0)
+                self.assertEqual(
+                    sum(stats['histogram'].values()), stats['requests'])
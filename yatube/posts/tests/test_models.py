@@ -1,7 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
 
-from ..models import Group, Post
+from ..models import Comment, Group, Post
 
 User = get_user_model()
 
@@ -60,3 +61,25 @@ class PostModelTest(TestCase):
             with self.subTest(field=field):
                 self.assertEqual(
                     post._meta.get_field(field).help_text, expected_value)
+
+    def test_changed_since(self):
+        """changed_since отдает только созданные и измененные объекты."""
+        checkpoint = timezone.now()
+        new_post = Post.objects.create(author=self.user, text='Новый пост')
+        self.assertQuerysetEqual(
+            Post.objects.changed_since(checkpoint), [new_post],
+            transform=lambda x: x
+        )
+        checkpoint = timezone.now()
+        self.post.text = 'Измененный пост'
+        self.post.save()
+        comment = Comment.objects.create(
+            author=self.user, post=new_post, text='Комментарий')
+        self.assertQuerysetEqual(
+            Post.objects.changed_since(checkpoint), [self.post],
+            transform=lambda x: x
+        )
+        self.assertQuerysetEqual(
+            Comment.objects.changed_since(checkpoint), [comment],
+            transform=lambda x: x
+        )
@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.accounts import delete_account
+from posts.models import Follow, Post, User
+from posts.partitions import PartitionedPaginator
+from posts.views import NUMBER_OF_POSTS_ON_PAGE
+
+
+class PartitionedPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='chronicler')
+        now = timezone.now()
+        for months_ago, count in ((0, 4), (1, 0), (2, 9), (5, 8)):
+            posts = Post.objects.bulk_create(
+                Post(author=cls.user, text=f'Пост {months_ago}-{i}')
+                for i in range(count))
+            Post.objects.filter(pk__in=[post.pk for post in posts]).update(
+                pub_date=now - timedelta(days=31 * months_ago))
+
+    def setUp(self):
+        cache.clear()
+
+    def pages(self, paginator):
+        return [
+            [post.pk for post in paginator.page(number)]
+            for number in paginator.page_range
+        ]
+
+    def test_pages_match_plain_paginator(self):
+        """Страницы по месяцам совпадают с обычной пагинацией."""
+        posts = Post.objects.all()
+        partitioned = PartitionedPaginator(posts, NUMBER_OF_POSTS_ON_PAGE)
+        plain = Paginator(posts, NUMBER_OF_POSTS_ON_PAGE)
+        self.assertEqual(partitioned.count, 21)
+        self.assertEqual(self.pages(partitioned), self.pages(plain))
+
+    def test_cold_cache_counts_in_one_query(self):
+        """Без кэша числа всех месяцев считаются одним запросом."""
+        with self.assertNumQueries(2):
+            # Границы ленты и числа постов по месяцам.
+            PartitionedPaginator(
+                Post.objects.all(), NUMBER_OF_POSTS_ON_PAGE).count
+
+    def test_counts_not_cached_without_shared_cache(self):
+        """Без общего кэша изменение, о котором этот процесс не узнал,
+        сразу видно в числах."""
+        posts = Post.objects.all()
+        PartitionedPaginator(posts, NUMBER_OF_POSTS_ON_PAGE).count
+        Post.objects.filter(
+            pk=Post.objects.order_by('pub_date').first().pk)._raw_delete(
+                Post.objects.db)
+        paginator = PartitionedPaginator(posts, NUMBER_OF_POSTS_ON_PAGE)
+        self.assertEqual(paginator.count, 20)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_closed_month_counts_cached_and_invalidated(self):
+        """Числа постов закрытых месяцев берутся из кэша, удаление
+        поста сбрасывает число его месяца."""
+        posts = Post.objects.all()
+        PartitionedPaginator(posts, NUMBER_OF_POSTS_ON_PAGE).count
+        with self.assertNumQueries(2):
+            # Границы ленты и текущий месяц.
+            PartitionedPaginator(posts, NUMBER_OF_POSTS_ON_PAGE).count
+        Post.objects.order_by('pub_date').first().delete()
+        paginator = PartitionedPaginator(posts, NUMBER_OF_POSTS_ON_PAGE)
+        self.assertEqual(paginator.count, 20)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_account_deletion_invalidates_counts(self):
+        posts = Post.objects.all()
+        PartitionedPaginator(posts, NUMBER_OF_POSTS_ON_PAGE).count
+        other = User.objects.create_user(username='latecomer')
+        post = Post.objects.create(author=other, text='Старый пост')
+        Post.objects.filter(pk=post.pk).update(
+            pub_date=timezone.now() - timedelta(days=31 * 5))
+        PartitionedPaginator(posts, NUMBER_OF_POSTS_ON_PAGE).count
+        delete_account(other)
+        paginator = PartitionedPaginator(posts, NUMBER_OF_POSTS_ON_PAGE)
+        self.assertEqual(paginator.count, 21)
+
+    @override_settings(POSTS_PARTITIONED_FEEDS=True, SHARED_CACHE=True)
+    def test_follow_feed_counts_follow_changes(self):
+        """Подписка и отписка меняют число постов в ленте подписок."""
+        reader = User.objects.create_user(username='reader')
+        client = Client()
+        client.force_login(reader)
+        url = reverse('posts:follow_index')
+        self.assertEqual(
+            client.get(url).context['page_obj'].paginator.count, 0)
+        Follow.objects.create(user=reader, author=self.user)
+        self.assertEqual(
+            client.get(url).context['page_obj'].paginator.count, 21)
+        Follow.objects.filter(user=reader).delete()
+        self.assertEqual(
+            client.get(url).context['page_obj'].paginator.count, 0)
+
+    @override_settings(POSTS_PARTITIONED_FEEDS=True)
+    def test_feeds_use_partitions(self):
+        client = Client()
+        for url in (reverse('posts:index'),
+                    reverse('posts:profile', args=(self.user.username,))):
+            with self.subTest(url=url):
+                response = client.get(url, {'page': 3})
+                page_obj = response.context['page_obj']
+                self.assertEqual(page_obj.paginator.count, 21)
+                self.assertEqual(
+                    [post.pk for post in page_obj],
+                    [Post.objects.order_by('pub_date').first().pk])
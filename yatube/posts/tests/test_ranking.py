@@ -0,0 +1,75 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Group, Post
+from posts.ranking import HALF_LIFE, add_points, compute_hot, hot_points
+
+User = get_user_model()
+
+
+class HotRankingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-group-slug',
+            description='Тестовое описание',
+        )
+        cls.old_post = Post.objects.create(
+            author=cls.user, text='Старый пост', group=cls.group)
+        cls.new_post = Post.objects.create(
+            author=cls.user, text='Новый пост', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_score_decays_with_time(self):
+        """Событие, случившееся на HALF_LIFE позже, весит вдвое больше."""
+        now = timezone.now()
+        later = now + timedelta(seconds=HALF_LIFE)
+        self.assertAlmostEqual(hot_points(later) - hot_points(now), 1)
+        self.assertAlmostEqual(
+            add_points(hot_points(now), hot_points(now)),
+            hot_points(later))
+
+    def test_comments_raise_post(self):
+        """Обсуждаемый пост поднимается выше нового в ?sort=hot."""
+        for i in range(3):
+            Comment.objects.create(
+                author=self.user, post=self.old_post, text=f'Коммент {i}')
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.context['page_obj'][0],
+                                 self.new_post)
+                response = self.guest_client.get(url, {'sort': 'hot'})
+                self.assertEqual(response.context['page_obj'][0],
+                                 self.old_post)
+
+    def test_recompute_matches_incremental_score(self):
+        """Пересчет дает тот же рейтинг, что и пошаговое обновление."""
+        comment = Comment.objects.create(
+            author=self.user, post=self.old_post, text='Коммент')
+        self.old_post.refresh_from_db()
+        incremental = self.old_post.hot
+        Post.objects.filter(pk=self.old_post.pk).update(hot=0)
+        call_command('recompute_hot', stdout=StringIO())
+        self.old_post.refresh_from_db()
+        self.assertAlmostEqual(self.old_post.hot, incremental)
+        self.assertAlmostEqual(
+            self.old_post.hot,
+            compute_hot(self.old_post.pub_date, [comment.pub_date]))
@@ -0,0 +1,107 @@
+import os
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from PIL import Image
+from sorl.thumbnail import default, get_thumbnail
+
+from posts import media
+from posts.models import Post, User
+from posts.tests.utils import TempMediaRootMixin
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def upload(name):
+    return SimpleUploadedFile(
+        name=name, content=SMALL_GIF, content_type='image/gif')
+
+
+class ContentAddressedStorageTests(TempMediaRootMixin, TestCase):
+    def test_duplicates_share_one_file(self):
+        """Одинаковые картинки под разными именами хранятся одним файлом."""
+        user = User.objects.create_user(username='uploader')
+        first = Post.objects.create(
+            author=user, text='Первый', image=upload('one.GIF'))
+        second = Post.objects.create(
+            author=user, text='Второй', image=upload('two.gif'))
+        self.assertEqual(first.image.name, second.image.name)
+        directory = os.path.dirname(first.image.path)
+        self.assertEqual(os.listdir(directory), [
+            os.path.basename(first.image.name)])
+        with open(first.image.path, 'rb') as file:
+            self.assertEqual(file.read(), SMALL_GIF)
+
+
+@mock.patch.object(media, 'RELEASE_GRACE', -1)
+class ReleaseImageTests(TempMediaRootMixin, TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner')
+
+    def test_file_deleted_with_last_reference(self):
+        """Файл удаляется только вместе с последним постом,
+        который на него ссылается."""
+        first = Post.objects.create(
+            author=self.user, text='Первый', image=upload('one.gif'))
+        second = Post.objects.create(
+            author=self.user, text='Второй', image=upload('two.gif'))
+        path = first.image.path
+        first.delete()
+        self.assertTrue(os.path.exists(path))
+        second.delete()
+        self.assertFalse(os.path.exists(path))
+
+    def test_replaced_image_released(self):
+        """При замене картинки старый файл без ссылок удаляется."""
+        post = Post.objects.create(
+            author=self.user, text='Пост', image=upload('one.gif'))
+        path = post.image.path
+        post.image = None
+        post.save()
+        self.assertFalse(os.path.exists(path))
+
+
+class GarbageCollectorTests(TempMediaRootMixin, TestCase):
+    def test_gc_media_removes_orphans(self):
+        """gc_media удаляет файлы без ссылок вместе с миниатюрами
+        и записями sorl-thumbnail, а --dry-run ничего не трогает."""
+        user = User.objects.create_user(username='collector')
+        post = Post.objects.create(
+            author=user, text='Пост', image=upload('kept.gif'))
+        kept_thumbnail = get_thumbnail(post.image, '10x10')
+        buffer = BytesIO()
+        Image.new('RGB', (4, 4), 'red').save(buffer, 'GIF')
+        storage = Post._meta.get_field('image').storage
+        orphan = media.image_field_file(
+            storage.save('posts/orphan.gif', ContentFile(buffer.getvalue())))
+        orphan_thumbnail = get_thumbnail(orphan, '10x10')
+        paths = {
+            'orphan': orphan.path,
+            'orphan_thumbnail': orphan_thumbnail.storage.path(
+                orphan_thumbnail.name),
+            'kept': post.image.path,
+            'kept_thumbnail': kept_thumbnail.storage.path(
+                kept_thumbnail.name),
+        }
+        call_command('gc_media', dry_run=True, grace=0, stdout=StringIO())
+        for name, path in paths.items():
+            with self.subTest(name=name):
+                self.assertTrue(os.path.exists(path))
+        call_command('gc_media', grace=0, stdout=StringIO())
+        for name, exists in (('orphan', False), ('orphan_thumbnail', False),
+                             ('kept', True), ('kept_thumbnail', True)):
+            with self.subTest(name=name):
+                self.assertEqual(os.path.exists(paths[name]), exists)
+        self.assertIsNone(default.kvstore.get(orphan_thumbnail))
+        self.assertIsNotNone(default.kvstore.get(kept_thumbnail))
@@ -1,25 +1,22 @@
-import shutil
-import tempfile
-
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django import forms
-from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 
 from posts.models import Post, Group, Comment, Follow
+from posts.tests.utils import TempMediaRootMixin
 from posts.views import NUMBER_OF_POSTS_ON_PAGE
+from users.resolver import warm_usernames
 
 
-TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 NUMBER_OF_POSTS_IN_DATABASE = 13
 User = get_user_model()
 
 
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
-class PostPagesTests(TestCase):
+class PostPagesTests(TempMediaRootMixin, TestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
@@ -72,11 +69,6 @@ class PostPagesTests(TestCase):
             post=cls.post,
         )
 
-    @classmethod
-    def tearDownClass(cls):
-        super().tearDownClass()
-        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
-
     def setUp(self):
         self.guest_client = Client()
         self.authorized_client = Client()
@@ -408,3 +400,66 @@ class PostPagesTests(TestCase):
         followers_count_after = Follow.objects.filter(
             user=self.user_not_author).count()
         self.assertEqual(followers_count_before, followers_count_after)
+
+
+# Считается конфигурация с общим кэшем, где сессии читаются из кэша.
+@override_settings(
+    SHARED_CACHE=True,
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+class QueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='counted')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='counted-group', description='Описание')
+        Post.objects.bulk_create(
+            Post(author=cls.author, group=cls.group, text=f'Пост {i}')
+            for i in range(NUMBER_OF_POSTS_IN_DATABASE))
+        cls.post = Post.objects.filter(author=cls.author).first()
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.reader, text=f'Ответ {i}')
+            for i in range(3))
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_profile_queries(self):
+        """Профиль: пользователь, автор со счетчиками и подпиской,
+        строки страницы. Сессия и id автора читаются из кэша."""
+        warm_usernames()
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('posts:profile', args=(self.author.username,)))
+        self.assertTrue(response.context['following'])
+        self.assertEqual(
+            response.context['page_obj'].paginator.count,
+            NUMBER_OF_POSTS_IN_DATABASE)
+
+    @override_settings(
+        SHARED_CACHE=False,
+        SESSION_ENGINE='django.contrib.sessions.backends.db')
+    def test_profile_queries_without_shared_cache(self):
+        """Без общего кэша: сессия, пользователь, автор по имени
+        со счетчиками и подпиской, строки страницы."""
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                reverse('posts:profile', args=(self.author.username,)))
+        self.assertTrue(response.context['following'])
+        response = self.client.get(
+            reverse('posts:profile', args=('nobody',)))
+        self.assertEqual(response.status_code, 404)
+
+    def test_post_detail_queries(self):
+        """Страница поста: пользователь, пост с автором, группой
+        и числом постов автора, комментарии с авторами."""
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('posts:post_detail', args=(self.post.pk,)))
+        self.assertEqual(
+            response.context['post'].author_posts_count,
+            NUMBER_OF_POSTS_IN_DATABASE)
+        self.assertEqual(len(response.context['comments']), 3)
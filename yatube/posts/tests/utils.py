@@ -0,0 +1,30 @@
+import shutil
+import tempfile
+
+from django.test import override_settings
+
+
+class TempMediaRootMixin:
+    """Свой временный MEDIA_ROOT вне проекта на каждый класс тестов:
+    классы не удаляют файлы друг друга и при запуске с --parallel."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_root_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_root_override.enable()
+        try:
+            super().setUpClass()
+        except Exception:
+            cls.remove_media_root()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.remove_media_root()
+
+    @classmethod
+    def remove_media_root(cls):
+        cls.media_root_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
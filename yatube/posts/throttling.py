@@ -0,0 +1,26 @@
+from django.core.cache import cache
+
+COMMENTS_PER_USER = 10
+COMMENTS_PER_POST = 120
+COMMENTS_PERIOD = 60
+
+
+def rate_limited(key, limit, period):
+    """Считает обращения по ключу в окне period секунд и сообщает,
+    превышен ли limit."""
+    cache.add(key, 0, period)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, period)
+        count = 1
+    return count > limit
+
+
+def comment_rate_limited(user_id, post_id):
+    return (
+        rate_limited(f'comment_rate:user:{user_id}',
+                     COMMENTS_PER_USER, COMMENTS_PERIOD)
+        or rate_limited(f'comment_rate:post:{post_id}',
+                        COMMENTS_PER_POST, COMMENTS_PERIOD)
+    )
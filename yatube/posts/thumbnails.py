@@ -0,0 +1,24 @@
+import time
+
+from sorl.thumbnail.base import ThumbnailBackend
+
+from core.metrics import THUMBNAIL_DURATION, THUMBNAIL_REQUESTS
+
+
+class MetricsThumbnailBackend(ThumbnailBackend):
+    """Бэкенд sorl-thumbnail, который считает запросы миниатюр
+    и время их создания."""
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        thumbnail = super().get_thumbnail(file_, geometry_string, **options)
+        created = thumbnail.__dict__.pop('_created', False)
+        THUMBNAIL_REQUESTS.inc(result='created' if created else 'cached')
+        return thumbnail
+
+    def _create_thumbnail(self, source_image, geometry_string, options,
+                          thumbnail):
+        started = time.perf_counter()
+        super()._create_thumbnail(
+            source_image, geometry_string, options, thumbnail)
+        THUMBNAIL_DURATION.observe(time.perf_counter() - started)
+        thumbnail._created = True
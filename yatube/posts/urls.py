@@ -1,20 +1,21 @@
 from django.urls import path
-from . import views
+from . import feeds, views
 
 app_name = 'posts'
 
+# Маршруты идут в порядке убывания нагрузки.
 urlpatterns = [
     path('', views.index, name='index'),
-    path('group/<slug:slug>/', views.group_list, name='group_list'),
-    path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
-    path('create/', views.create_post, name='create_post'),
-    path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path('profile/<str:username>/', views.profile, name='profile'),
+    path('group/<slug:slug>/', views.group_list, name='group_list'),
+    path('follow/', views.follow_index, name='follow_index'),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment, name='add_comment'
     ),
-    path('follow/', views.follow_index, name='follow_index'),
+    path('create/', views.create_post, name='create_post'),
+    path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -25,4 +26,34 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path('groups/', views.groups, name='groups'),
+    path(
+        'groups/autocomplete/',
+        views.groups_autocomplete,
+        name='groups_autocomplete'
+    ),
+    path('groups/api/', views.groups_api, name='groups_api'),
+    path('feed/', feeds.PostsFeed(), name='index_feed'),
+    path('feed/atom/', feeds.AtomPostsFeed(), name='index_atom'),
+    path(
+        'group/<slug:slug>/feed/',
+        feeds.GroupPostsFeed(),
+        name='group_feed'
+    ),
+    path(
+        'group/<slug:slug>/feed/atom/',
+        feeds.AtomGroupPostsFeed(),
+        name='group_atom'
+    ),
+    path(
+        'profile/<str:username>/feed/',
+        feeds.AuthorPostsFeed(),
+        name='profile_feed'
+    ),
+    path(
+        'profile/<str:username>/feed/atom/',
+        feeds.AtomAuthorPostsFeed(),
+        name='profile_atom'
+    ),
+    path('changes/', views.changes, name='changes'),
 ]
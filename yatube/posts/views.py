@@ -1,25 +1,70 @@
+from functools import partial
+from http import HTTPStatus
+
 from django.shortcuts import render, get_object_or_404, redirect
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.db.models import Exists, OuterRef
+from django.http import JsonResponse
+
+from .archive import ChainedPosts, get_post_or_archived
+from core.cache import shared_cache
+from core.models import SubqueryCount
+from users.resolver import get_user_id_or_404
 
-from .models import Post, Group, User, Follow
+from .changes import CHANGES_BATCH_SIZE, change_as_dict, read_changes
+from .comment_writer import comment_writer
+from .models import ArchivedPost, Post, Group, User, Follow
 from django.core.paginator import Paginator
+from .groups import group_directory_page, group_index
 from .forms import PostForm, CommentForm
+from .partitions import (
+    PartitionedPaginator, PartitionedPosts, follow_version_key)
+from .throttling import comment_rate_limited
 
 NUMBER_OF_POSTS_ON_PAGE = 10
+NUMBER_OF_GROUPS_ON_PAGE = 20
+SORT_HOT = 'hot'
 
 
-def get_page_obj(post_list, NUMBER_OF_POSTS_ON_PAGE, request):
-    paginator = Paginator(post_list, NUMBER_OF_POSTS_ON_PAGE)
+def get_page_obj(post_list, NUMBER_OF_POSTS_ON_PAGE, request,
+                 paginator_class=Paginator):
+    paginator = paginator_class(post_list, NUMBER_OF_POSTS_ON_PAGE)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
 
 
+def get_sort(request):
+    return SORT_HOT if request.GET.get('sort') == SORT_HOT else ''
+
+
+def feed_paginator(sort=''):
+    """Ленты от новых к старым можно читать по месяцам,
+    рейтинг по месяцам не разбивается."""
+    if sort != SORT_HOT and getattr(
+            settings, 'POSTS_PARTITIONED_FEEDS', False):
+        return PartitionedPaginator
+    return Paginator
+
+
+def sort_posts(post_list, sort):
+    """При sort=hot посты идут по рейтингу, иначе - от новых к старым."""
+    if sort == SORT_HOT:
+        return post_list.order_by('-hot', '-pk')
+    return post_list
+
+
 def index(request):
     template = 'posts/index.html'
-    post_list = Post.objects.select_related('group')
-    page_obj = get_page_obj(post_list, NUMBER_OF_POSTS_ON_PAGE, request)
+    sort = get_sort(request)
+    post_list = sort_posts(
+        Post.objects.select_related('author', 'group'), sort)
+    page_obj = get_page_obj(
+        post_list, NUMBER_OF_POSTS_ON_PAGE, request, feed_paginator(sort))
     context = {
         'page_obj': page_obj,
+        'sort': sort,
     }
     return render(request, template, context)
 
@@ -27,28 +72,77 @@ def index(request):
 def group_list(request, slug):
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.select_related('author')
-    page_obj = get_page_obj(post_list, NUMBER_OF_POSTS_ON_PAGE, request)
+    sort = get_sort(request)
+    post_list = sort_posts(group.posts.select_related('author'), sort)
+    page_obj = get_page_obj(
+        post_list, NUMBER_OF_POSTS_ON_PAGE, request, feed_paginator(sort))
     context = {
         'group': group,
         'page_obj': page_obj,
+        'sort': sort,
     }
     return render(request, template, context)
 
 
+def groups(request):
+    template = 'posts/groups.html'
+    page_obj = group_directory_page(
+        request.GET.get('page'), NUMBER_OF_GROUPS_ON_PAGE)
+    return render(request, template, {'page_obj': page_obj})
+
+
+def groups_api(request):
+    """Страница page каталога групп в JSON."""
+    page_obj = group_directory_page(
+        request.GET.get('page'), NUMBER_OF_GROUPS_ON_PAGE)
+    return JsonResponse({
+        'groups': list(page_obj.object_list),
+        'page': page_obj.number,
+        'num_pages': page_obj.paginator.num_pages,
+        'count': page_obj.paginator.count,
+    })
+
+
+def groups_autocomplete(request):
+    """Группы, чье название начинается с q."""
+    prefix = request.GET.get('q', '').strip()
+    rows = group_index().startswith(prefix) if prefix else []
+    return JsonResponse(
+        {'groups': [{'id': pk, 'title': title} for pk, title in rows]})
+
+
 def profile(request, username):
     template = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
-    #
-    post_list = author.posts.all()
+    # Автор, оба счетчика постов и подписка читаются одним запросом.
+    authors = User.objects.annotate(
+        posts_count=SubqueryCount(Post.objects.filter(author=OuterRef('pk'))),
+        archived_count=SubqueryCount(
+            ArchivedPost.objects.filter(author=OuterRef('pk'))),
+    )
+    if request.user.is_authenticated:
+        authors = authors.annotate(is_followed=Exists(Follow.objects.filter(
+            user=request.user, author=OuterRef('pk'))))
+    if shared_cache():
+        author = get_object_or_404(authors, pk=get_user_id_or_404(username))
+    else:
+        # Без общего кэша id не берется из кэша: автор ищется по имени
+        # тем же запросом.
+        author = get_object_or_404(authors, username=username)
+    post_list = Post.objects.filter(author_id=author.pk).select_related(
+        'author', 'group')
+    posts_count = author.posts_count
+    if feed_paginator() is PartitionedPaginator:
+        post_list = PartitionedPosts(post_list)
+        posts_count = None
+    post_list = ChainedPosts(
+        post_list, author.archived_posts.select_related('author', 'group'),
+        posts_count, author.archived_count)
     page_obj = get_page_obj(post_list, NUMBER_OF_POSTS_ON_PAGE, request)
     if request.user.is_authenticated:
-        user = get_object_or_404(User, username=request.user)
         context = {
             'page_obj': page_obj,
             'author': author,
-            'following': Follow.objects.filter(
-                user=user, author=author).exists(),
+            'following': author.is_followed,
         }
         return render(request, template, context)
     context = {
@@ -60,13 +154,14 @@ def profile(request, username):
 
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_post_or_archived(post_id)
     form = CommentForm(request.POST or None)
-    comments = post.comments.all()
+    comments = post.comments.select_related('author')
     context = {
         'post': post,
         'form': form,
         'comments': comments,
+        'archived': isinstance(post, ArchivedPost),
     }
     return render(request, template, context)
 
@@ -109,23 +204,33 @@ def post_edit(request, post_id):
 
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.only('pk'), pk=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
+        if comment_rate_limited(request.user.pk, post_id):
+            return render(
+                request, 'core/429.html', status=HTTPStatus.TOO_MANY_REQUESTS)
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        comment_writer.save(comment)
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
 def follow_index(request):
     template = 'posts/follow.html'
-    follower = get_object_or_404(User, username=request.user)
+    follower = request.user
     post_list = Post.objects.filter(
-        author__following__user=follower).exclude(author=follower)
-    page_obj = get_page_obj(post_list, NUMBER_OF_POSTS_ON_PAGE, request)
+        author__following__user=follower).exclude(
+            author=follower).select_related('author', 'group')
+    paginator_class = feed_paginator()
+    if paginator_class is PartitionedPaginator:
+        # Состав ленты меняется и при подписке или отписке.
+        paginator_class = partial(
+            paginator_class, version_keys=[follow_version_key(follower.pk)])
+    page_obj = get_page_obj(
+        post_list, NUMBER_OF_POSTS_ON_PAGE, request, paginator_class)
     context = {
         'page_obj': page_obj,
     }
@@ -134,22 +239,38 @@ def follow_index(request):
 
 @login_required
 def profile_follow(request, username):
-    user = get_object_or_404(User, username=request.user)
-    author = get_object_or_404(User, username=username)
-    if author != user:
+    user = request.user
+    author_id = get_user_id_or_404(username)
+    if author_id != user.pk:
         Follow.objects.get_or_create(
             user=user,
-            author=author,
+            author_id=author_id,
         )
     return redirect('posts:profile', username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    user = get_object_or_404(User, username=request.user.username)
-    author = get_object_or_404(User, username=username)
+    user = request.user
     Follow.objects.filter(
         user=user,
-        author=author,
+        author_id=get_user_id_or_404(username),
     ).delete()
     return render(request, 'posts/follow.html')
+
+
+@staff_member_required
+def changes(request):
+    """Порция журнала изменений после номера since."""
+    try:
+        since = int(request.GET.get('since', 0))
+        limit = int(request.GET.get('limit', CHANGES_BATCH_SIZE))
+        limit = max(1, min(limit, CHANGES_BATCH_SIZE))
+    except ValueError:
+        return JsonResponse({'error': 'since и limit - целые числа'},
+                            status=400)
+    batch = read_changes(since, limit)
+    return JsonResponse({
+        'changes': [change_as_dict(change) for change in batch],
+        'next_since': batch[-1].seq if batch else since,
+    })
@@ -0,0 +1,62 @@
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from core.cache import delete_after_commit, shared_cache
+
+USER_CACHE_TIMEOUT = 60 * 5
+HITS_KEY = 'auth_user_cache:hits'
+MISSES_KEY = 'auth_user_cache:misses'
+
+
+def user_cache_key(user_id):
+    return f'auth_user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    delete_after_commit([user_cache_key(user_id)])
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def user_cache_stats():
+    """Попадания и промахи кэша пользователей с последнего сброса
+    или None, если кэш не общий и пользователи не кэшируются."""
+    if not shared_cache():
+        return None
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else None,
+    }
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берет пользователя для request.user из кэша.
+
+    Хеш пароля входит в закэшированный объект, поэтому Django по-прежнему
+    сверяет с ним хеш из сессии. Любое сохранение или удаление пользователя
+    сбрасывает его запись в кэше (users.signals). Сброс должен дойти до
+    всех воркеров, поэтому без общего кэша пользователь читается из базы.
+    """
+
+    def get_user(self, user_id):
+        if not shared_cache():
+            return super().get_user(user_id)
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is not None:
+            _count(HITS_KEY)
+            return user if self.user_can_authenticate(user) else None
+        _count(MISSES_KEY)
+        user = super().get_user(user_id)
+        if user is not None:
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+        return user
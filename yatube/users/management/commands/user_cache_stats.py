@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from users.backends import user_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает, как часто request.user берется из кэша.'
+
+    def handle(self, *args, **options):
+        stats = user_cache_stats()
+        if stats is None:
+            self.stdout.write(
+                'Кэш не общий (не задан YATUBE_MEMCACHED): request.user '
+                'читается из базы, статистики нет.')
+            return
+        rate = stats['hit_rate']
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {"-" if rate is None else f"{rate:.1%}"}')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from users.resolver import WARM_LIMIT, warm_usernames
+
+
+class Command(BaseCommand):
+    help = ('Заполняет кэш username -> id для недавно входивших '
+            'пользователей. Нужна при общем кэше, например memcached.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=WARM_LIMIT)
+
+    def handle(self, *args, **options):
+        warmed = warm_usernames(options['limit'])
+        self.stdout.write(f'В кэше имен пользователей: {warmed}')
@@ -0,0 +1,83 @@
+"""Кэш соответствия username -> (id, полное имя).
+
+Страницы профиля, подписки и отписки получают id автора по имени из URL
+без запроса к базе. Несуществующие имена тоже кэшируются, ненадолго,
+чтобы перебор адресов не доходил до базы.
+
+После переименования имя может перейти к другому пользователю, поэтому
+кэш используется только общий для всех процессов (SHARED_CACHE): иначе
+другие воркеры продолжали бы подписывать на прежнего владельца имени.
+"""
+from hashlib import md5
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+
+from core.cache import delete_after_commit, shared_cache
+
+USERNAME_CACHE_TIMEOUT = 60 * 10
+MISSING_USERNAME_TIMEOUT = 60
+WARM_LIMIT = 10000
+WARM_BATCH_SIZE = 1000
+MISSING = ()
+
+User = get_user_model()
+
+
+def username_key(username):
+    # В URL может оказаться что угодно, поэтому имя хешируется.
+    return f'username:{md5(username.encode()).hexdigest()}'
+
+
+def _entry(first_name, last_name, pk):
+    return pk, f'{first_name} {last_name}'.strip()
+
+
+def _lookup(username):
+    row = User.objects.filter(username=username).values_list(
+        'first_name', 'last_name', 'pk').first()
+    return MISSING if row is None else _entry(*row)
+
+
+def resolve_username(username):
+    """(id, полное имя) пользователя или None, если его нет."""
+    if not shared_cache():
+        return _lookup(username) or None
+    key = username_key(username)
+    entry = cache.get(key)
+    if entry is None:
+        entry = _lookup(username)
+        cache.set(key, entry, USERNAME_CACHE_TIMEOUT if entry else (
+            MISSING_USERNAME_TIMEOUT))
+    return entry or None
+
+
+def get_user_id_or_404(username):
+    entry = resolve_username(username)
+    if entry is None:
+        raise Http404('Пользователь не найден')
+    return entry[0]
+
+
+def forget_usernames(*usernames):
+    delete_after_commit(username_key(name) for name in usernames if name)
+
+
+def warm_usernames(limit=WARM_LIMIT, batch_size=WARM_BATCH_SIZE):
+    """Заполняет кэш для недавно входивших пользователей пачками
+    set_many. Возвращает число записей, без общего кэша - 0."""
+    if not shared_cache():
+        return 0
+    rows = User.objects.order_by('-last_login').values_list(
+        'username', 'first_name', 'last_name', 'pk')[:limit]
+    warmed = 0
+    batch = {}
+    for username, *fields in rows.iterator(chunk_size=batch_size):
+        batch[username_key(username)] = _entry(*fields)
+        if len(batch) >= batch_size:
+            cache.set_many(batch, USERNAME_CACHE_TIMEOUT)
+            warmed += len(batch)
+            batch = {}
+    cache.set_many(batch, USERNAME_CACHE_TIMEOUT)
+    return warmed + len(batch)
@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .backends import invalidate_cached_user
+from .resolver import forget_usernames
+
+RESOLVED_FIELDS = {'username', 'first_name', 'last_name'}
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(pre_save, sender=User)
+def forget_old_username(sender, instance, update_fields, **kwargs):
+    """Сбрасывает кэш старого и нового имени: новое могло быть
+    закэшировано как несуществующее."""
+    if update_fields is not None and not RESOLVED_FIELDS & set(update_fields):
+        return
+    old = None
+    if instance.pk is not None:
+        old = User.objects.filter(pk=instance.pk).values_list(
+            'username', flat=True).first()
+    forget_usernames(old, instance.username)
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_username(sender, instance, **kwargs):
+    forget_usernames(instance.username)
@@ -1 +1,113 @@
-# from django.test import TestCase
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from users.backends import user_cache_key, user_cache_stats
+from users.resolver import resolve_username, warm_usernames
+
+User = get_user_model()
+
+
+@override_settings(
+    SHARED_CACHE=True,
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+class CachedUserBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='cached', password='old-password')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_user_taken_from_cache(self):
+        """Со второго запроса пользователь не читается из базы."""
+        url = reverse('about:author')
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+        self.assertEqual(user_cache_stats(), {
+            'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_cache_invalidated_on_save(self):
+        """Смена пароля сбрасывает кэш, и старая сессия перестает
+        действовать."""
+        url = reverse('posts:follow_index')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('new-password')
+        user.save()
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_no_cache_without_shared_cache(self):
+        """С кэшем отдельного процесса пользователь всегда читается из
+        базы, а команда статистики сообщает, что ее нет."""
+        url = reverse('about:author')
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.client.get(url)
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        out = StringIO()
+        call_command('user_cache_stats', stdout=out)
+        self.assertIn('статистики нет', out.getvalue())
+
+
+@override_settings(SHARED_CACHE=True)
+class UsernameResolverTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='resolved', first_name='Иван', last_name='Петров')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_unknown_username_cached(self):
+        """Повторный запрос несуществующего профиля не доходит до базы."""
+        url = reverse('posts:profile', args=('nobody',))
+        self.assertEqual(self.client.get(url).status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_warm_usernames(self):
+        self.assertEqual(warm_usernames(), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                resolve_username('resolved'), (self.user.pk, 'Иван Петров'))
+
+    def test_rename_invalidates(self):
+        """Смена имени убирает старое имя и новое, закэшированное
+        как несуществующее."""
+        resolve_username('resolved')
+        self.assertIsNone(resolve_username('renamed'))
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'renamed'
+        user.save()
+        self.assertIsNone(resolve_username('resolved'))
+        self.assertEqual(resolve_username('renamed')[0], self.user.pk)
+
+    def test_new_user_invalidates(self):
+        self.assertIsNone(resolve_username('newcomer'))
+        user = User.objects.create_user(username='newcomer')
+        self.assertEqual(resolve_username('newcomer'), (user.pk, ''))
+
+    @override_settings(SHARED_CACHE=False)
+    def test_no_cache_without_shared_cache(self):
+        """Без общего кэша имя всегда сверяется с базой: изменение
+        в другом процессе видно сразу."""
+        resolve_username('resolved')
+        User.objects.filter(pk=self.user.pk).update(username='elsewhere')
+        self.assertIsNone(resolve_username('resolved'))
+        self.assertEqual(resolve_username('elsewhere')[0], self.user.pk)
+        self.assertEqual(warm_usernames(), 0)
@@ -0,0 +1,26 @@
+"""
+ASGI config for yatube project.
+
+Django 2.2 has no native ASGI support, so the WSGI application is served
+through core.asgi.WsgiToAsgi: requests run in a bounded thread pool.
+
+    uvicorn yatube.asgi:application
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+from core.asgi import MAX_WORKERS, WsgiToAsgi
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+application = WsgiToAsgi(
+    get_wsgi_application(),
+    max_workers=int(os.environ.get('YATUBE_ASGI_THREADS', MAX_WORKERS)),
+)
+
+if os.environ.get('YATUBE_PRELOAD', '0') == '1':
+    from core.startup import preload
+
+    preload()
@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,6 +93,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Тестовая база в файле, как рабочая: база в памяти с общим
+        # кэшем не ждет блокировку, а сразу отвечает «table is locked»,
+        # и многопоточные тесты падали бы на записи из соседних потоков.
+        'TEST': {
+            'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3'),
+        },
     }
 }
 
@@ -145,16 +152,64 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': os.path.join(BASE_DIR, 'cache'),
-
+# Общий для всех процессов кэш - memcached по адресу YATUBE_MEMCACHED,
+# например 127.0.0.1:11211. Без него у каждого процесса свой LocMem, и то,
+# что должно сбрасываться сразу во всех воркерах (request.user, имена
+# пользователей, сессии), в кэше не хранится: см. SHARED_CACHE.
+MEMCACHED_LOCATION = os.environ.get('YATUBE_MEMCACHED')
+SHARED_CACHE = bool(MEMCACHED_LOCATION)
+
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.MetricsMemcachedCache',
+            'LOCATION': MEMCACHED_LOCATION,
+        }
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.MetricsLocMemCache',
+            'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        }
+    }
+
+# request.user берется из кэша. ModelBackend оставлен, чтобы не разлогинить
+# пользователей, вошедших до его появления.
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Сессии: cached_db читает сессию из кэша и идет в базу только при промахе,
+# cache и signed_cookies не трогают базу вовсе. cached_db включается по
+# умолчанию только с общим кэшем: с LocMem выход из аккаунта в одном
+# воркере оставил бы сессию действующей в остальных.
+# Просроченные сессии в базе удаляет команда purge_sessions.
+SESSION_ENGINE = 'django.contrib.sessions.backends.' + os.environ.get(
+    'YATUBE_SESSION_ENGINE', 'cached_db' if SHARED_CACHE else 'db')
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/2.2/howto/static-files/
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Ленты постов читаются по месяцам, см. posts.partitions
+POSTS_PARTITIONED_FEEDS = False
+
+# Метрики: /metrics доступен только с этих адресов. За обратным прокси
+# на том же сервере REMOTE_ADDR у всех запросов - адрес прокси, и список
+# адресов пропускает любого: тогда задайте METRICS_TOKEN
+# (YATUBE_METRICS_TOKEN) и передавайте заголовок
+# "Authorization: Bearer <токен>" или закройте /metrics в прокси.
+# С токеном адрес не проверяется. При нескольких процессах задайте общий
+# каталог METRICS_DIR (YATUBE_METRICS_DIR).
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+METRICS_TOKEN = os.environ.get('YATUBE_METRICS_TOKEN')
+METRICS_DIR = os.environ.get('YATUBE_METRICS_DIR')
+
+THUMBNAIL_BACKEND = 'posts.thumbnails.MetricsThumbnailBackend'
+
+# Запуск тестов: python manage.py test --parallel
+TEST_RUNNER = 'core.test_runner.TimedTestRunner'
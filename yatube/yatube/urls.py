@@ -13,18 +13,30 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.lazy import LazyURLConf
+from core.resolvers import prefix_path
+from core.views import metrics
+
+
+def admin_urls():
+    from django.contrib import admin
+
+    return admin.site.get_urls()
+
+
+# Маршруты posts получают большую часть запросов и проверяются первыми.
 urlpatterns = [
-    path('', include('posts.urls', namespace='posts')),
-    path('group/<slug:slug>/', include('posts.urls', namespace='posts')),
-    path('admin/', admin.site.urls),
+    prefix_path('', 'posts.urls', namespace='posts'),
+    # Маршруты админки строятся при первом обращении к ней.
+    path('admin/', (LazyURLConf(admin_urls), 'admin', 'admin')),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('metrics', metrics, name='metrics'),
 ]
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.permission_denied'
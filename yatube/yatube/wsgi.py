@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+# С YATUBE_PRELOAD=1 маршруты, шаблоны и кэши готовятся до первого
+# запроса, см. core.startup.
+if os.environ.get('YATUBE_PRELOAD', '0') == '1':
+    from core.startup import preload
+
+    preload()